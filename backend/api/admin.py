@@ -4,6 +4,11 @@ from .models.observation_groups import ObservationGroup
 from .models.schedule import Schedule
 from .models.administrators import Administrator
 from .models.user import Users
+from .models.lesson_plans import LessonPlan, LessonPlanFile
+from .models.notifications import Notification
+from .models.schedule_archive import ArchivedSchedule
+from .models.tenants import Tenant
+from .models.digests import PendingNotification
 # Register your models here.
 
 @admin.register(Teacher)
@@ -30,6 +35,32 @@ class AdministratorAdmin(admin.ModelAdmin):
 class UsersAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'role')
 
+@admin.register(LessonPlan)
+class LessonPlanAdmin(admin.ModelAdmin):
+    list_display = ('title', 'teacher', 'date', 'is_submitted', 'filename')
 
+@admin.register(LessonPlanFile)
+class LessonPlanFileAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'size', 'content_type', 'created_at')
 
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'type', 'is_read', 'created_at')
 
+@admin.register(ArchivedSchedule)
+class ArchivedScheduleAdmin(admin.ModelAdmin):
+    list_display = ('teacher', 'observation_group', 'date', 'time', 'status', 'archived_at')
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(Tenant)
+class TenantAdmin(admin.ModelAdmin):
+    list_display = ('school_name', 'district', 'slug')
+    search_fields = ('school_name', 'district', 'slug')
+    prepopulated_fields = {'slug': ('school_name',)}
+
+@admin.register(PendingNotification)
+class PendingNotificationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'schedule_id', 'created_at')
+    list_select_related = ('user',)
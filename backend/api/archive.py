@@ -0,0 +1,119 @@
+"""
+Moving finished schedules out of the live table, and reading history across both
+"""
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import BooleanField, Q, Value
+
+from .caching import bump_version
+from .models.schedule import Schedule
+from .models.schedule_archive import ArchivedSchedule
+
+ARCHIVABLE_STATUSES = ('Completed', 'Cancelled')
+DEFAULT_ARCHIVE_AFTER_DAYS = 180
+DEFAULT_ARCHIVE_BATCH_SIZE = 1000
+
+# Columns copied verbatim from Schedule into ArchivedSchedule
+ARCHIVED_FIELDS = [
+    'id', 'observation_group_id', 'teacher_id', 'date', 'time', 'duration_minutes', 'observation_type', 'notes',
+    'status', 'notification_sent', 'reminder_sent', 'notification_sent_at', 'reminder_sent_at', 'created_at', 'updated_at',
+]
+
+# Columns returned by schedule_history, shared by both tables
+HISTORY_FIELDS = ['id', 'teacher_id', 'observation_group_id', 'date', 'time', 'observation_type', 'notes', 'status']
+
+
+def archive_cutoff(older_than_days: Optional[int] = None) -> date:
+    days = older_than_days if older_than_days is not None else getattr(settings, 'SCHEDULE_ARCHIVE_AFTER_DAYS', DEFAULT_ARCHIVE_AFTER_DAYS)
+    return date.today() - timedelta(days=days)
+
+
+def archivable(cutoff: date):
+    return Schedule.objects.filter(status__in=ARCHIVABLE_STATUSES, date__lt=cutoff)
+
+
+def _delete_schedules(ids):
+    """
+    Delete schedules by id with one DELETE statement
+
+    Unlike QuerySet.delete() this neither collects related rows nor sends the
+    per-row delete signals, which would announce archiving as deletions.
+    Nothing references Schedule, so there is nothing to collect.
+    """
+    connection = connections[router.db_for_write(Schedule)]
+    pk = Schedule._meta.pk
+    quote = connection.ops.quote_name
+    values = [pk.get_db_prep_value(value, connection) for value in ids]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(Schedule._meta.db_table)} WHERE {quote(pk.column)} IN ({', '.join(['%s'] * len(values))})",
+            values,
+        )
+
+
+def archive_batch(cutoff: date, batch_size: int = DEFAULT_ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move one batch of finished schedules dated before cutoff into the archive
+
+    Copy and delete happen in one transaction, so a row is always in exactly
+    one of the two tables.
+
+    Returns:
+        Number of schedules moved; 0 once nothing is left to archive
+    """
+    with transaction.atomic():
+        rows = list(archivable(cutoff).order_by('date', 'id').values(*ARCHIVED_FIELDS)[:batch_size])
+        if not rows:
+            return 0
+        ArchivedSchedule.objects.bulk_create([ArchivedSchedule(**row) for row in rows], ignore_conflicts=True)
+        _delete_schedules([row['id'] for row in rows])
+        transaction.on_commit(lambda: bump_version(Schedule))
+    return len(rows)
+
+
+def archive_schedules(older_than_days: Optional[int] = None, batch_size: int = DEFAULT_ARCHIVE_BATCH_SIZE) -> int:
+    """Archive every finished schedule older than the configured age, batch by batch"""
+    cutoff = archive_cutoff(older_than_days)
+    total = 0
+    while True:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            return total
+        total += moved
+
+
+def _filtered(queryset, teacher=None, start: Optional[date] = None, end: Optional[date] = None, statuses: Optional[Iterable[str]] = None,
+              tenant=None):
+    if tenant is not None:
+        queryset = queryset.filter(Q(teacher__tenant=tenant) | Q(observation_group__tenant=tenant))
+    if teacher is not None:
+        queryset = queryset.filter(teacher=teacher)
+    if start is not None:
+        queryset = queryset.filter(date__gte=start)
+    if end is not None:
+        queryset = queryset.filter(date__lte=end)
+    if statuses:
+        queryset = queryset.filter(status__in=list(statuses))
+    return queryset
+
+
+def schedule_history(teacher=None, start: Optional[date] = None, end: Optional[date] = None, statuses: Optional[Iterable[str]] = None,
+                     tenant=None):
+    """
+    Schedules from the live and archive tables as one queryset of dicts
+
+    Each row has the HISTORY_FIELDS plus ``archived``; ordering is newest first.
+    Filters are applied to both tables before the UNION ALL, so each side can
+    use its own date indexes. tenant limits both sides to one school's
+    teachers and groups.
+    """
+    live = _filtered(Schedule.objects.order_by(), teacher, start, end, statuses, tenant).values(
+        *HISTORY_FIELDS, archived=Value(False, output_field=BooleanField()),
+    )
+    archived = _filtered(ArchivedSchedule.objects.order_by(), teacher, start, end, statuses, tenant).values(
+        *HISTORY_FIELDS, archived=Value(True, output_field=BooleanField()),
+    )
+    return live.union(archived, all=True).order_by('-date', '-time')
@@ -0,0 +1,236 @@
+"""
+In-process endpoint benchmarks for the api and auths routes
+
+Every named route is either described in ENDPOINTS or listed in SKIPPED with
+a reason, so new routes cannot silently escape the budget. Results are
+compared against a checked-in baseline by the benchmark_endpoints command.
+
+This module doubles as the URLconf the benchmarks run under, since auths.urls
+is not mounted in the project URLconf.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, include, path
+
+# Latency is machine-dependent, so it gets a wide margin; query counts are exact
+DEFAULT_TOLERANCE = 1.0
+DEFAULT_METRIC = 'p50'
+# Absolute slack so sub-millisecond endpoints do not fail on timer noise
+DEFAULT_SLACK_MS = 2.0
+
+
+class Endpoint(NamedTuple):
+    name: str
+    method: str
+    url: Callable[[Dict], str]
+    data: Optional[Callable[[Dict], Dict]] = None
+    headers: Optional[Callable[[Dict], Dict]] = None
+
+
+def _bearer(fixture):
+    return {'Authorization': f"Bearer {fixture['access']}"}
+
+
+# api routes need a role, so they run as the fixture's administrator
+def _get(name, url, headers=None):
+    return Endpoint(name, 'get', url, headers=headers or (_bearer if name.startswith('api:') else None))
+
+
+def _post(name, url, data, headers=None):
+    return Endpoint(name, 'post', url, data, headers or (_bearer if name.startswith('api:') else None))
+
+
+ENDPOINTS = [
+    _get('api:api-root', lambda f: '/api/'),
+    _get('api:total-stats', lambda f: '/api/total-stats/'),
+    _post('api:django-auth-login', lambda f: '/api/auth/login/', lambda f: {'email': f['email'], 'password': f['password']}),
+    _get('api:users-list', lambda f: '/api/users/'),
+    _get('api:users-export', lambda f: '/api/users/export/?output=ndjson'),
+    _get('api:users-detail', lambda f: f"/api/users/{f['user']}/"),
+    _get('api:users-notification-preferences', lambda f: f"/api/users/{f['user']}/notification-preferences/"),
+    _get('api:teacher-list', lambda f: '/api/teachers/'),
+    _get('api:teacher-export', lambda f: '/api/teachers/export/?output=csv'),
+    _get('api:teacher-detail', lambda f: f"/api/teachers/{f['teacher']}/"),
+    _get('api:observationgroup-list', lambda f: '/api/observation-groups/'),
+    _get('api:observationgroup-detail', lambda f: f"/api/observation-groups/{f['group']}/"),
+    _post('api:observationgroup-plan', lambda f: f"/api/observation-groups/{f['group']}/plan/",
+          lambda f: {'start_date': f['plan_start'], 'end_date': f['plan_end']}),
+    _get('api:schedule-list', lambda f: '/api/schedules/'),
+    _get('api:schedule-export', lambda f: '/api/schedules/export/?output=ndjson'),
+    _get('api:schedule-detail', lambda f: f"/api/schedules/{f['schedule']}/"),
+    _post('api:schedule-send-reminder', lambda f: f"/api/schedules/{f['schedule']}/send_reminder/", lambda f: {}),
+    _get('api:administrator-list', lambda f: '/api/administrators/'),
+    _get('api:administrator-detail', lambda f: f"/api/administrators/{f['administrator']}/"),
+    _get('api:lessonplan-list', lambda f: '/api/lesson-plans/'),
+    _get('api:lessonplan-detail', lambda f: f"/api/lesson-plans/{f['lesson_plan']}/"),
+    _get('api:lessonplan-download', lambda f: f"/api/lesson-plans/{f['lesson_plan']}/download/"),
+    _post('api:lessonplanupload-list', lambda f: '/api/lesson-plan-uploads/',
+          lambda f: {'lesson_plan': f['lesson_plan'], 'filename': 'plan.pdf', 'total_size': 1024}),
+    _get('api:lessonplanupload-detail', lambda f: f"/api/lesson-plan-uploads/{f['upload']}/"),
+    _get('api:notification-list', lambda f: f"/api/notifications/?user={f['user']}"),
+    _post('api:notification-mark-read', lambda f: '/api/notifications/mark_read/', lambda f: {'user': f['user']}),
+    _get('api:notification-unread-count', lambda f: f"/api/notifications/unread_count/?user={f['user']}"),
+    _get('api:notification-detail', lambda f: f"/api/notifications/{f['notification']}/?user={f['user']}"),
+    _get('api:archivedschedule-list', lambda f: '/api/schedule-archive/'),
+    _get('api:archivedschedule-detail', lambda f: f"/api/schedule-archive/{f['archived_schedule']}/"),
+    _get('api:archivedschedule-history', lambda f: f"/api/schedule-archive/history/?teacher={f['teacher']}"),
+    _get('auths:api-root', lambda f: '/auth/'),
+    # A new address each time, so registration succeeds rather than hitting "Email already exists"
+    _post('auths:register', lambda f: '/auth/register/', lambda f: {
+        'first_name': 'Ada', 'last_name': 'Lovelace', 'email': f['new_email'](),
+        'password': 'benchmark-pass', 'confirm_password': 'benchmark-pass',
+    }),
+    _post('auths:login', lambda f: '/auth/login/', lambda f: {'email': f['email'], 'password': f['password']}),
+    _get('auths:verify-email', lambda f: '/auth/verify-email/'),
+    _post('auths:request-password-reset', lambda f: '/auth/request-password-reset/', lambda f: {'email': 'nobody@example.org'}),
+    _post('auths:password-reset', lambda f: '/auth/password-reset/', lambda f: {'email': 'nobody@example.org', 'code': '000000', 'new_password': 'benchmark-pass-2'}),
+    _post('auths:logout', lambda f: '/auth/logout/', lambda f: {'refresh': f['new_refresh']()}, headers=_bearer),
+    _post('auths:token-refresh', lambda f: '/auth/token/refresh/', lambda f: {'refresh': f['refresh']}),
+]
+
+SKIPPED = {
+    'api:event-stream': 'Server-Sent Events stream never completes',
+    'api:users-bulk-import': 'Each request creates accounts; measured by benchmark_hashing',
+    'api:lessonplanupload-chunk': 'Needs a fresh upload offset per request',
+    'api:schedule-bulk-status': 'Each request moves schedules out of the state the next one needs',
+    'auths:google-auth': 'Verifies tokens against Google',
+}
+
+
+def route_names(patterns, namespace: str) -> List[str]:
+    """Names of every route in a URLconf, prefixed with namespace"""
+    names = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names.extend(route_names(pattern.url_patterns, namespace))
+        elif pattern.name:
+            names.append(f'{namespace}:{pattern.name}')
+    return sorted(set(names))
+
+
+def uncovered_routes() -> List[str]:
+    from api import urls as api_urls
+    from auths import urls as auths_urls
+    covered = {endpoint.name for endpoint in ENDPOINTS} | set(SKIPPED)
+    names = route_names(api_urls.urlpatterns, 'api') + route_names(auths_urls.urlpatterns, 'auths')
+    return [name for name in names if name not in covered]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(timings: List[float], queries: Optional[int], status: int) -> Dict:
+    return {
+        'p50': round(percentile(timings, 50), 3),
+        'p95': round(percentile(timings, 95), 3),
+        'p99': round(percentile(timings, 99), 3),
+        'rps': round(len(timings) / (sum(timings) / 1000), 1) if sum(timings) else 0.0,
+        'queries': queries,
+        'status': status,
+    }
+
+
+def _request_kwargs(endpoint: Endpoint, fixture: Dict) -> Dict:
+    kwargs = {'headers': endpoint.headers(fixture)} if endpoint.headers else {}
+    if endpoint.data is not None:
+        kwargs.update(data=endpoint.data(fixture), content_type='application/json')
+    return kwargs
+
+
+def _drain(response):
+    # Streaming bodies (exports, downloads) do their work while being read
+    if response.streaming:
+        b''.join(response.streaming_content)
+
+
+async def _adrain(response):
+    if response.streaming:
+        if hasattr(response.streaming_content, '__aiter__'):
+            async for _ in response.streaming_content:
+                pass
+        else:
+            # Same as the ASGI handler: sync iterators are read off the event loop
+            await sync_to_async(b''.join)(response.streaming_content)
+
+
+def run_sync(client, endpoint: Endpoint, fixture: Dict, iterations: int, warmup: int = 2) -> Dict:
+    """Time an endpoint through the WSGI test client, counting queries of the last request"""
+    url = endpoint.url(fixture)
+    send = getattr(client, endpoint.method)
+    for _ in range(warmup):
+        _drain(send(url, **_request_kwargs(endpoint, fixture)))
+
+    timings = []
+    for _ in range(iterations):
+        # Built per request so endpoints can use single-use values such as fresh tokens
+        kwargs = _request_kwargs(endpoint, fixture)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = send(url, **kwargs)
+            _drain(response)
+            timings.append((time.perf_counter() - started) * 1000)
+    return summarize(timings, len(queries), response.status_code)
+
+
+def run_async(client, endpoint: Endpoint, fixture: Dict, iterations: int, warmup: int = 2) -> Dict:
+    """Time an endpoint through the ASGI handler; queries are not counted across threads"""
+    url = endpoint.url(fixture)
+
+    async def drive():
+        send = getattr(client, endpoint.method)
+        for _ in range(warmup):
+            await _adrain(await send(url, **_request_kwargs(endpoint, fixture)))
+        timings = []
+        for _ in range(iterations):
+            kwargs = _request_kwargs(endpoint, fixture)
+            started = time.perf_counter()
+            response = await send(url, **kwargs)
+            await _adrain(response)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, response.status_code
+
+    timings, status = asyncio.run(drive())
+    return summarize(timings, None, status)
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE, slack_ms: float = DEFAULT_SLACK_MS,
+            metric: str = DEFAULT_METRIC) -> List[str]:
+    """
+    Regressions of results against baseline
+
+    Both are nested as {scale: {endpoint: {client: summary}}}. A query count
+    above the baseline always fails; the latency metric fails once it exceeds
+    the baseline by more than tolerance (a fraction) plus slack_ms. Entries
+    missing from the baseline are not compared.
+    """
+    failures = []
+    for scale, endpoints in results.items():
+        for name, clients in endpoints.items():
+            for client, current in clients.items():
+                expected = baseline.get(scale, {}).get(name, {}).get(client)
+                if not expected:
+                    continue
+                label = f'{name} [{client}, scale {scale}]'
+                if current['status'] != expected['status']:
+                    failures.append(f"{label}: status {current['status']} != baseline {expected['status']}")
+                if current['queries'] is not None and expected['queries'] is not None and current['queries'] > expected['queries']:
+                    failures.append(f"{label}: {current['queries']} queries > baseline {expected['queries']}")
+                limit = expected[metric] * (1 + tolerance) + slack_ms
+                if current[metric] > limit:
+                    failures.append(f"{label}: {metric} {current[metric]:.2f}ms > {limit:.2f}ms (baseline {expected[metric]:.2f}ms)")
+    return failures
+
+
+urlpatterns = [
+    path('api/', include('api.urls')),
+    path('auth/', include('auths.urls')),
+]
@@ -0,0 +1,175 @@
+"""
+HTTP and response caching helpers for the api viewsets
+"""
+import hashlib
+import time
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .tenancy import tenant_cache_namespace
+
+
+def build_validators(queryset, fields: Sequence[str], scope: str) -> Tuple[str, Optional[int]]:
+    """
+    Compute an ETag and Last-Modified timestamp for a queryset in one aggregate query
+
+    The ETag covers the row count and the newest timestamp of every field in
+    `fields`, so inserts, updates and deletes (including on nested related
+    rows) all change it.
+
+    Returns:
+        (etag, last_modified); last_modified is None for an empty queryset
+    """
+    aggregates = {'_count': Count('pk', distinct=True)}
+    for index, field in enumerate(fields):
+        aggregates[f'_max{index}'] = Max(field)
+    values = queryset.order_by().aggregate(**aggregates)
+
+    stamps = [values[f'_max{index}'] for index in range(len(fields))]
+    present = [stamp for stamp in stamps if stamp is not None]
+
+    raw = '|'.join([scope, str(values['_count'])] + [stamp.isoformat() if stamp else '' for stamp in stamps])
+    etag = f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+    return etag, int(max(present).timestamp()) if present else None
+
+
+class ConditionalGetMixin:
+    """
+    Answers list and retrieve requests with 304 Not Modified when the client's
+    If-None-Match / If-Modified-Since validators still match, before any
+    serialization happens.
+
+    Viewsets list in validator_fields every updated_at lookup that feeds their
+    serialized output, e.g. ('updated_at', 'user__updated_at').
+    """
+    validator_fields: Sequence[str] = ('updated_at',)
+
+    def _conditional(self, request, queryset, scope):
+        try:
+            etag, last_modified = build_validators(queryset, self.validator_fields, scope)
+        except (TypeError, ValueError, DjangoValidationError):
+            return None, None, None
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        return not_modified, etag, last_modified
+
+    def _set_validators(self, response, etag, last_modified):
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        scope = f'{tenant_cache_namespace()}:{self.basename}:list'
+        not_modified, etag, last_modified = self._conditional(request, self.filter_queryset(self.get_queryset()), scope)
+        if not_modified is not None:
+            return not_modified
+        return self._set_validators(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            # Malformed lookup value; the normal retrieve path answers 404
+            return super().retrieve(request, *args, **kwargs)
+        scope = f'{tenant_cache_namespace()}:{self.basename}:detail:{self.kwargs[lookup_url_kwarg]}'
+        not_modified, etag, last_modified = self._conditional(request, queryset, scope)
+        if not_modified is not None:
+            return not_modified
+        return self._set_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+
+DEFAULT_DETAIL_CACHE_TTL = 300
+# How long a rebuild may hold the single-flight lock, and how long others wait on it
+REBUILD_LOCK_TIMEOUT = 10
+REBUILD_WAIT = 2.0
+REBUILD_POLL_INTERVAL = 0.02
+
+
+def _version_key(model) -> str:
+    return f'version:{model._meta.label_lower}'
+
+
+def get_version(model) -> int:
+    """Current cache version of a model, initialised from the clock after eviction"""
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Starting from the clock keeps a re-created counter ahead of any old value
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(model):
+    """Invalidate every cached payload built from a model's rows"""
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def read_through(key: str, build: Callable[[], Any], ttl: int) -> Any:
+    """
+    Return the cached value for key, building and storing it on a miss
+
+    Concurrent misses are collapsed: one caller takes a short lock and rebuilds
+    while the others poll briefly for its result before building themselves.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, REBUILD_LOCK_TIMEOUT):
+        try:
+            value = build()
+            cache.set(key, value, ttl)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + REBUILD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return build()
+
+
+class CachedRetrieveMixin:
+    """
+    Serves retrieve responses from a read-through cache of serialized payloads
+
+    Keys combine the tenant, viewset, primary key and the version counters of every
+    model in cache_dependencies, which signals bump on any write, so a change
+    to any row feeding the payload makes the old entry unreachable.
+    """
+    cache_dependencies: Sequence = ()
+
+    def detail_cache_key(self, pk) -> str:
+        versions = '.'.join(str(get_version(model)) for model in self.cache_dependencies)
+        return f'detail:{tenant_cache_namespace()}:{self.basename}:{pk}:{versions}'
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        ttl = getattr(settings, 'DETAIL_CACHE_TTL', DEFAULT_DETAIL_CACHE_TTL)
+
+        def build():
+            instance = self.get_object()
+            return dict(self.get_serializer(instance).data)
+
+        data = read_through(self.detail_cache_key(self.kwargs[lookup_url_kwarg]), build, ttl)
+        return Response(data)
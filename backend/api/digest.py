@@ -0,0 +1,255 @@
+"""
+Daily notification digests
+
+Users who chose digest delivery get their observation emails queued as
+PendingNotification rows instead of sent one by one. send_digests, run once
+a day by the send_notification_digests command, turns each user's queue into
+a single email over one SMTP connection and clears the rows it delivered.
+"""
+import logging
+import uuid
+from contextlib import nullcontext
+from datetime import timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.html import escape
+
+from .caching import bump_version
+from .models.digests import PendingNotification
+from .models.observation_groups import ObservationGroup
+from .models.schedule import Schedule
+from .models.teachers import Teacher
+from .models.user import Users
+from .notifications import NotificationService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIGEST_SUBJECT = 'Your Daily Observation Digest - T-TESS Bloom'
+DEFAULT_CLAIM_TIMEOUT = 60 * 60
+DIGEST_ROWS = [
+    ('Date', 'date'),
+    ('Time', 'time'),
+    ('Type', 'observation_type'),
+    ('Group', 'group_name'),
+    ('Observer', 'observer_name'),
+    ('Notes', 'notes'),
+]
+
+
+def wants_digest(user: Users) -> bool:
+    return user.notification_delivery == 'digest'
+
+
+def deliver_observation_scheduled(recipients: Iterable[Tuple[Users, Dict, str]], schedule_id=None, connection=None) -> Dict[str, int]:
+    """
+    Email or queue "observation scheduled" notifications
+
+    Digest users are queued with one bulk insert; everyone else is emailed
+    straight away through NotificationService, over one connection so the
+    sending quota's max_wait bounds the whole batch rather than each email.
+
+    Args:
+        recipients: (user, observation_data, observer_name) per teacher
+        schedule_id: Schedule the notifications are about
+        connection: Open email connection to send over; one is opened if needed
+
+    Returns:
+        Counts of 'sent', 'queued' and 'failed' notifications
+    """
+    counts = {'sent': 0, 'queued': 0, 'failed': 0}
+    queued, direct = [], []
+    for user, observation_data, observer_name in recipients:
+        if wants_digest(user):
+            queued.append(PendingNotification(
+                user=user,
+                schedule_id=schedule_id,
+                data={**observation_data, 'observer_name': observer_name},
+            ))
+        else:
+            direct.append((user, observation_data, observer_name))
+    if direct:
+        with nullcontext(connection) if connection else get_connection() as connection:
+            for user, observation_data, observer_name in direct:
+                if NotificationService.send_observation_scheduled_notification(
+                    teacher_email=user.email,
+                    teacher_name=user.name,
+                    observation_data=observation_data,
+                    observer_name=observer_name,
+                    connection=connection,
+                ):
+                    counts['sent'] += 1
+                else:
+                    counts['failed'] += 1
+    if queued:
+        PendingNotification.objects.bulk_create(queued)
+        counts['queued'] = len(queued)
+    return counts
+
+
+def scheduled_email_data(schedule: Schedule, teacher: Teacher, group_name: str = None) -> Dict:
+    """Template context of one teacher's "observation scheduled" email"""
+    data = {
+        'date': schedule.date.strftime('%B %d, %Y'),
+        'time': schedule.time.strftime('%I:%M %p'),
+        'observation_type': schedule.observation_type,
+        'subject': teacher.subject or 'Not specified',
+        'grade': teacher.grade or 'Not specified',
+        'notes': schedule.notes or '',
+    }
+    if group_name:
+        data['group_name'] = group_name
+    return data
+
+
+def notify_planned_schedules(group: ObservationGroup, schedules: Iterable[Schedule]) -> Dict[str, int]:
+    """
+    Email or queue the "observation scheduled" notification of each planned slot
+
+    Each slot goes through deliver_observation_scheduled, as a schedule created
+    one at a time does, sharing one email connection. Slots whose email went
+    out are marked notified in one UPDATE; queued ones are marked when their
+    digest is sent.
+
+    Args:
+        group: Group the slots were planned for
+        schedules: Schedules created by commit_group_plan
+
+    Returns:
+        Counts of 'sent', 'queued' and 'failed' notifications
+    """
+    schedules = list(schedules)
+    observer_name = group.created_by.name if group.created_by else "Administrator"
+    teachers = Teacher.objects.select_related('user').in_bulk({schedule.teacher_id for schedule in schedules})
+
+    counts = {'sent': 0, 'queued': 0, 'failed': 0}
+    notified = []
+    with get_connection() as connection:
+        for schedule in schedules:
+            teacher = teachers.get(schedule.teacher_id)
+            if not teacher or not teacher.user or not teacher.user.email:
+                continue
+            delivered = deliver_observation_scheduled(
+                [(teacher.user, scheduled_email_data(schedule, teacher, group.name), observer_name)], schedule.id, connection,
+            )
+            for key, value in delivered.items():
+                counts[key] += value
+            if delivered['sent']:
+                notified.append(schedule.id)
+
+    if notified:
+        now = timezone.now()
+        Schedule.objects.filter(id__in=notified).update(notification_sent=True, notification_sent_at=now, updated_at=now)
+        # update() skips the signals that invalidate cached schedule payloads
+        bump_version(Schedule)
+    return counts
+
+
+def render_digest(user: Users, items: List[PendingNotification]) -> Tuple[str, str, str]:
+    """
+    Subject, plain text and HTML bodies of one user's digest, built in one pass over the items
+
+    Returns:
+        (subject, text, html)
+    """
+    config = settings.NOTIFICATION_SETTINGS.get('OBSERVATION_DIGEST', {})
+    subject = config.get('subject', DEFAULT_DIGEST_SUBJECT)
+    site_url = getattr(settings, 'SITE_URL', '')
+    count = len(items)
+    intro = f"{count} observation{'s have' if count != 1 else ' has'} been scheduled for you since your last digest."
+
+    text_parts = [f"Hello {user.name},", "", intro, ""]
+    html_parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        f'<title>{escape(subject)}</title></head>',
+        '<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">',
+        f'<h2>Hello {escape(user.name)},</h2><p>{escape(intro)}</p>',
+    ]
+    for index, item in enumerate(items, start=1):
+        rows = []
+        for label, key in DIGEST_ROWS:
+            value = item.data.get(key)
+            if value:
+                rows.append((label, value.replace('_', ' ').title() if key == 'observation_type' else str(value)))
+        text_parts.append(f"{index}. " + '; '.join(f"{label}: {value}" for label, value in rows))
+        html_parts.append('<div style="background: #f9f9f9; padding: 12px; border-radius: 8px; margin: 12px 0;">')
+        html_parts.extend(f'<div><strong style="color: #84547c;">{label}:</strong> {escape(value)}</div>' for label, value in rows)
+        html_parts.append('</div>')
+
+    text_parts += ["", f"View your observations: {site_url}/teacher/observations"]
+    html_parts.append(f'<p><a href="{escape(site_url)}/teacher/observations">View Your Observations</a></p>')
+    html_parts.append('<p style="color: #666; font-size: 12px;">You receive one digest a day. Change this in your notification preferences.</p></body></html>')
+    return subject, '\n'.join(text_parts), ''.join(html_parts)
+
+
+def send_digests(dry_run: bool = False, connection=None) -> Dict:
+    """
+    Send every user with queued notifications one digest email
+
+    All digests go out over a single connection. The run first claims the
+    rows it will send with one UPDATE, so overlapping runs never send the
+    same row twice; rows of a run that died are claimed again once
+    claim_timeout has passed. Rows are only cleared, and their schedules
+    marked as notified, for digests that were sent; the claim on the others
+    is released so the next run retries them.
+
+    Returns:
+        Counts of 'users' emailed and 'items' delivered, and 'failed' emails
+    """
+    report = {'users': 0, 'items': 0, 'failed': []}
+    config = settings.NOTIFICATION_SETTINGS.get('OBSERVATION_DIGEST', {})
+    if not config.get('enabled', False):
+        logger.info("Notification digests are disabled; pending notifications are kept")
+        return report
+
+    now = timezone.now()
+    claimable = PendingNotification.objects.filter(
+        Q(claimed_by__isnull=True) | Q(claimed_at__lt=now - timedelta(seconds=config.get('claim_timeout', DEFAULT_CLAIM_TIMEOUT)))
+    )
+    if dry_run:
+        report.update(users=claimable.values('user_id').distinct().count(), items=claimable.count())
+        return report
+
+    # A single UPDATE: a concurrent run blocks on the same rows, then finds them claimed
+    claim = uuid.uuid4()
+    claimable.update(claimed_by=claim, claimed_at=now)
+    claimed = PendingNotification.objects.filter(claimed_by=claim)
+    pending = list(claimed.select_related('user').order_by('user_id', 'created_at'))
+
+    delivered: List[PendingNotification] = []
+    # A daily batch job: wait out the sending quota instead of failing fast
+    connection = connection or get_connection(max_wait=None)
+    with connection:
+        for _, group in groupby(pending, key=lambda item: item.user_id):
+            items = list(group)
+            user = items[0].user
+            subject, text, html = render_digest(user, items)
+            message = EmailMultiAlternatives(subject, text, settings.DEFAULT_FROM_EMAIL, [user.email], connection=connection)
+            message.attach_alternative(html, 'text/html')
+            try:
+                message.send()
+            except Exception as e:
+                logger.error(f"Failed to send notification digest to {user.email}: {str(e)}")
+                report['failed'].append(user.email)
+                continue
+            delivered.extend(items)
+            report['users'] += 1
+
+    if len(delivered) < len(pending):
+        claimed.exclude(id__in=[item.id for item in delivered]).update(claimed_by=None, claimed_at=None)
+    if delivered:
+        with transaction.atomic():
+            claimed.filter(id__in=[item.id for item in delivered]).delete()
+            schedule_ids = {item.schedule_id for item in delivered if item.schedule_id}
+            Schedule.objects.filter(id__in=schedule_ids, notification_sent=False).update(
+                notification_sent=True, notification_sent_at=timezone.now(), updated_at=timezone.now(),
+            )
+            # update() skips the signals that invalidate cached schedule payloads
+            transaction.on_commit(lambda: bump_version(Schedule))
+    report['items'] = len(delivered)
+    return report
@@ -0,0 +1,281 @@
+"""
+Quota-aware SMTP email backend
+
+Spreads outgoing mail over one or more sender accounts, each with its own
+token bucket, so bursts are smoothed to a steady rate that stays under the
+provider's sending limits. A 4xx reply (Gmail's "try again later"
+throttling) backs the account off exponentially and the message is retried
+on the next available account; 5xx replies are permanent failures.
+
+Rate limits and backoff are shared by the whole process; SMTP connections
+belong to one backend instance. Between open() and close() (for example
+inside ``with get_connection() as connection:``) each account keeps one
+connection for every message sent; a lone send_messages() call opens what
+it needs and closes it again, like Django's SMTP backend.
+
+Waiting for a token or for a backed-off account is capped at max_wait
+seconds (EMAIL_SEND_MAX_WAIT) in total for one send_messages() call, or for
+everything sent between open() and close(), after which SendThrottled is
+raised. Request code that mails several people shares one opened connection,
+so its wait stays bounded however many recipients there are. Management
+commands and the digest pass max_wait=None to wait as long as it takes.
+
+Configure with EMAIL_SENDER_ACCOUNTS (a list of dicts with username,
+password and optionally from_email), EMAIL_SEND_RATE (messages per second
+per account), EMAIL_SEND_BURST, EMAIL_BACKOFF_BASE, EMAIL_BACKOFF_MAX,
+EMAIL_SEND_MAX_ATTEMPTS and EMAIL_SEND_MAX_WAIT. Without
+EMAIL_SENDER_ACCOUNTS the single EMAIL_HOST_USER account is used.
+"""
+import logging
+import smtplib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEND_RATE = 1.0
+DEFAULT_SEND_BURST = 10
+DEFAULT_BACKOFF_BASE = 2.0
+DEFAULT_BACKOFF_MAX = 300.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_MAX_WAIT = 2.0
+
+# Distinguishes "not passed" from max_wait=None, which means wait forever
+_SETTING = object()
+
+
+class SendThrottled(smtplib.SMTPException):
+    """No sender account could take the message within max_wait"""
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, and bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the seconds until one is"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a token; False, without waiting, if none would come within timeout seconds"""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if deadline is not None and self.clock() + wait > deadline:
+                return False
+            self.sleep(wait)
+
+
+class SenderAccount:
+    """One SMTP login with its own rate limit and backoff state"""
+
+    def __init__(self, username, password, from_email=None, rate=DEFAULT_SEND_RATE, burst=DEFAULT_SEND_BURST, **connection):
+        self.username = username
+        self.password = password
+        self.from_email = from_email
+        self.connection = connection
+        self.bucket = TokenBucket(rate, burst)
+        self.failures = 0
+        self.available_at = 0.0
+
+    def __repr__(self):
+        return f'<SenderAccount {self.username}>'
+
+    def connect(self) -> SMTPBackend:
+        """A new, not yet opened, SMTP backend logged in as this account"""
+        return SMTPBackend(username=self.username, password=self.password, fail_silently=False, **self.connection)
+
+    def back_off(self, base: float, ceiling: float):
+        self.failures += 1
+        delay = min(ceiling, base * 2 ** (self.failures - 1))
+        self.available_at = time.monotonic() + delay
+        return delay
+
+    def succeeded(self):
+        self.failures = 0
+
+
+def _temporary(error: smtplib.SMTPException) -> bool:
+    """Whether an SMTP error is a 4xx "try again later" reply or a dropped connection"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    code = getattr(error, 'smtp_code', None)
+    return code is not None and 400 <= code < 500
+
+
+class ThrottledSMTPBackend(BaseEmailBackend):
+    """SMTP backend that rate-limits, rotates sender accounts and backs off on throttling"""
+
+    # Accounts are shared by every backend instance in the process, so the
+    # rate limit holds across the connections Django opens per send_mail call
+    _accounts: Optional[List[SenderAccount]] = None
+    _accounts_lock = threading.Lock()
+    _next = 0
+
+    def __init__(self, fail_silently=False, accounts: Optional[List[SenderAccount]] = None, max_wait=_SETTING, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.accounts = accounts or self.shared_accounts()
+        self.backoff_base = getattr(settings, 'EMAIL_BACKOFF_BASE', DEFAULT_BACKOFF_BASE)
+        self.backoff_max = getattr(settings, 'EMAIL_BACKOFF_MAX', DEFAULT_BACKOFF_MAX)
+        self.max_attempts = getattr(settings, 'EMAIL_SEND_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+        self.max_wait = getattr(settings, 'EMAIL_SEND_MAX_WAIT', DEFAULT_MAX_WAIT) if max_wait is _SETTING else max_wait
+        self._connections: Dict[str, SMTPBackend] = {}
+        self._opened = False
+        self._deadline: Optional[float] = None
+
+    @classmethod
+    def build_accounts(cls) -> List[SenderAccount]:
+        configured = getattr(settings, 'EMAIL_SENDER_ACCOUNTS', None) or [
+            {'username': settings.EMAIL_HOST_USER, 'password': settings.EMAIL_HOST_PASSWORD},
+        ]
+        connection = {
+            'host': settings.EMAIL_HOST,
+            'port': settings.EMAIL_PORT,
+            'use_tls': settings.EMAIL_USE_TLS,
+            'use_ssl': settings.EMAIL_USE_SSL,
+            'timeout': settings.EMAIL_TIMEOUT,
+        }
+        rate = getattr(settings, 'EMAIL_SEND_RATE', DEFAULT_SEND_RATE)
+        burst = getattr(settings, 'EMAIL_SEND_BURST', DEFAULT_SEND_BURST)
+        return [SenderAccount(rate=rate, burst=burst, **{**connection, **account}) for account in configured]
+
+    @classmethod
+    def shared_accounts(cls) -> List[SenderAccount]:
+        with cls._accounts_lock:
+            if cls._accounts is None:
+                cls._accounts = cls.build_accounts()
+            return cls._accounts
+
+    @classmethod
+    def reset_accounts(cls):
+        with cls._accounts_lock:
+            cls._accounts = None
+
+    def open(self):
+        """Connect every account; the connections are reused until close()"""
+        if self._opened:
+            return False
+        self._opened = True
+        self._deadline = self._new_deadline()
+        opened, error = False, None
+        for account in self.accounts:
+            try:
+                opened = bool(self._connection(account).open()) or opened
+            except (smtplib.SMTPException, OSError) as e:
+                # Left to the first message sent through the account to retry
+                logger.warning(f"Could not connect as {account.username}: {e}")
+                error = e
+        if error is not None and not opened and not self.fail_silently:
+            self.close()
+            raise error
+        return opened
+
+    def close(self):
+        self._opened = False
+        connections, self._connections = self._connections, {}
+        for backend in connections.values():
+            backend.close()
+
+    def _new_deadline(self) -> Optional[float]:
+        return None if self.max_wait is None else time.monotonic() + self.max_wait
+
+    def _connection(self, account: SenderAccount) -> SMTPBackend:
+        backend = self._connections.get(account.username)
+        if backend is None:
+            backend = self._connections[account.username] = account.connect()
+        return backend
+
+    def _drop(self, account: SenderAccount):
+        # The provider may have closed a throttled connection anyway
+        backend = self._connections.pop(account.username, None)
+        if backend is not None:
+            backend.close()
+
+    def _pick(self, deadline: Optional[float]) -> SenderAccount:
+        """Next account in rotation that is not backing off, waiting until deadline for one if all are"""
+        while True:
+            now = time.monotonic()
+            with self._accounts_lock:
+                count = len(self.accounts)
+                for offset in range(count):
+                    account = self.accounts[(ThrottledSMTPBackend._next + offset) % count]
+                    if account.available_at <= now:
+                        ThrottledSMTPBackend._next = (ThrottledSMTPBackend._next + offset + 1) % count
+                        return account
+                wait = min(account.available_at for account in self.accounts) - now
+            if deadline is not None and now + wait > deadline:
+                raise SendThrottled(f'Every sender account is backing off for at least {wait:.1f}s')
+            time.sleep(max(wait, 0.01))
+
+    def _send(self, message, deadline: Optional[float]) -> bool:
+        original_from = message.from_email
+        for attempt in range(1, self.max_attempts + 1):
+            account = self._pick(deadline)
+            if not account.bucket.acquire(None if deadline is None else max(deadline - time.monotonic(), 0.0)):
+                raise SendThrottled(f'{account.username} is over its sending rate')
+            if account.from_email and original_from == settings.DEFAULT_FROM_EMAIL:
+                # The provider only relays mail from the authenticated account
+                message.from_email = account.from_email
+            try:
+                backend = self._connection(account)
+                backend.open()
+                sent = backend.send_messages([message])
+            except smtplib.SMTPException as e:
+                if not _temporary(e) or attempt == self.max_attempts:
+                    raise
+                delay = account.back_off(self.backoff_base, self.backoff_max)
+                self._drop(account)
+                logger.warning(f"{account.username} was throttled ({e}); backing off {delay:.0f}s")
+                continue
+            finally:
+                message.from_email = original_from
+            account.succeeded()
+            return bool(sent)
+        return False
+
+    def send_messages(self, email_messages) -> int:
+        sent = 0
+        # One budget for the whole call (or the whole open() session), not per message
+        deadline = self._deadline if self._opened else self._new_deadline()
+        try:
+            for message in email_messages:
+                if not message.recipients():
+                    continue
+                try:
+                    sent += self._send(message, deadline)
+                except (smtplib.SMTPException, OSError) as e:
+                    logger.error(f"Failed to send email to {', '.join(message.recipients())}: {e}")
+                    if not self.fail_silently:
+                        raise
+        finally:
+            # Connections opened for this call alone are not kept
+            if not self._opened:
+                self.close()
+        return sent
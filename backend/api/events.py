@@ -0,0 +1,156 @@
+"""
+Live change events for T-TESS Bloom, delivered to browsers as Server-Sent Events
+
+Model signals publish events through a process-wide broadcaster. The backend
+is pluggable via the EVENTS_BACKEND setting; the default in-memory backend only
+reaches subscribers connected to the same process.
+
+Events carry the tenant that was active when they were published, and a
+subscriber bound to a tenant never receives another tenant's events.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from .tenancy import current_tenant_id
+
+DEFAULT_BACKEND = 'api.events.InMemoryBackend'
+
+# Events buffered per subscriber before new ones are dropped for a slow client
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, user_id: Optional[str] = None, tenant_id: Optional[str] = None):
+        self.user_id = str(user_id) if user_id else None
+        self.tenant_id = str(tenant_id) if tenant_id else None
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def wants(self, event: Dict) -> bool:
+        tenant = event.get('tenant')
+        if self.tenant_id and tenant and tenant != self.tenant_id:
+            return False
+        audience = event.get('audience')
+        if audience is None:
+            # Broadcasts reach a tenant's subscribers only when published for that tenant
+            return not self.tenant_id or tenant == self.tenant_id
+        return self.user_id in audience
+
+    def _put(self, event: Dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    def deliver(self, event: Dict):
+        """Hand an event to the subscriber's loop; safe to call from any thread"""
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._put, event)
+
+
+class BaseBackend:
+    """Interface for event transports: publish from sync code, subscribe from async code"""
+
+    def publish(self, event: Dict):
+        raise NotImplementedError
+
+    def subscribe(self, user_id: Optional[str] = None, tenant_id: Optional[str] = None) -> Subscription:
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription: Subscription):
+        raise NotImplementedError
+
+    def has_subscribers(self) -> bool:
+        """Whether publishing could reach anyone; lets publishers skip building events"""
+        return True
+
+
+class InMemoryBackend(BaseBackend):
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event: Dict):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.wants(event):
+                subscription.deliver(event)
+
+    def subscribe(self, user_id: Optional[str] = None, tenant_id: Optional[str] = None) -> Subscription:
+        subscription = Subscription(user_id, tenant_id)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_event_ids = itertools.count(1)
+
+
+def get_backend() -> BaseBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(getattr(settings, 'EVENTS_BACKEND', DEFAULT_BACKEND))()
+    return _backend
+
+
+def publish(event_type: str, data: Dict, audience: Optional[Iterable] = None):
+    """
+    Publish an event to subscribers
+
+    Args:
+        event_type: Event name, e.g. 'schedule.created'
+        data: JSON-serialisable payload
+        audience: Users ids allowed to receive the event; None broadcasts to all
+    """
+    tenant_id = current_tenant_id()
+    get_backend().publish({
+        'id': next(_event_ids),
+        'type': event_type,
+        'data': data,
+        'audience': None if audience is None else {str(user_id) for user_id in audience if user_id},
+        'tenant': str(tenant_id) if tenant_id else None,
+    })
+
+
+def format_sse(event: Dict) -> str:
+    payload = json.dumps(event['data'], cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+async def stream_events(user_id: Optional[str] = None, heartbeat: Optional[float] = None,
+                        tenant_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Yield SSE-formatted events for a user within a tenant, with periodic comment heartbeats"""
+    heartbeat = heartbeat or getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 15)
+    backend = get_backend()
+    subscription = backend.subscribe(user_id, tenant_id)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        backend.unsubscribe(subscription)
@@ -0,0 +1,138 @@
+"""
+Streaming CSV/NDJSON exports for T-TESS Bloom list endpoints
+"""
+import csv
+import io
+from typing import Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched per database round trip and written per response chunk
+DEFAULT_CHUNK_SIZE = 2000
+
+USER_EXPORT_FIELDS = [
+    ('id', 'id'),
+    ('name', 'name'),
+    ('email', 'email'),
+    ('role', 'role'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+TEACHER_EXPORT_FIELDS = [
+    ('id', 'id'),
+    ('user_id', 'user_id'),
+    ('name', 'user__name'),
+    ('email', 'user__email'),
+    ('subject', 'subject'),
+    ('grade', 'grade'),
+    ('years_of_experience', 'years_of_experience'),
+    ('created_at', 'created_at'),
+]
+
+SCHEDULE_EXPORT_FIELDS = [
+    ('id', 'id'),
+    ('date', 'date'),
+    ('time', 'time'),
+    ('observation_type', 'observation_type'),
+    ('status', 'status'),
+    ('teacher_id', 'teacher_id'),
+    ('teacher_name', 'teacher__user__name'),
+    ('teacher_email', 'teacher__user__email'),
+    ('observation_group_id', 'observation_group_id'),
+    ('observation_group_name', 'observation_group__name'),
+    ('notes', 'notes'),
+    ('notification_sent', 'notification_sent'),
+    ('reminder_sent', 'reminder_sent'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+
+
+def _chunks(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(rows: Iterable[Tuple], headers: List[str], chunk_size: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield buffer.getvalue()
+
+    for chunk in _chunks(rows, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+
+
+def stream_ndjson(rows: Iterable[Tuple], headers: List[str], chunk_size: int) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for chunk in _chunks(rows, chunk_size):
+        yield ''.join(encoder.encode(dict(zip(headers, row))) + '\n' for row in chunk)
+
+
+def export_response(queryset, fields: List[Tuple[str, str]], filename: str, export_format: str = 'csv') -> StreamingHttpResponse:
+    """
+    Stream a queryset as CSV or NDJSON without materialising model instances
+
+    Rows are read as value tuples through a chunked server-side cursor, so memory
+    stays flat however many rows the export covers.
+
+    Args:
+        queryset: Filtered queryset to export
+        fields: (column header, ORM lookup) pairs, in output order
+        filename: Download name without extension
+        export_format: 'csv' or 'ndjson'
+    """
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    headers = [header for header, _ in fields]
+    rows = queryset.values_list(*[lookup for _, lookup in fields]).iterator(chunk_size=chunk_size)
+
+    if export_format == 'ndjson':
+        content = stream_ndjson(rows, headers, chunk_size)
+    else:
+        content = stream_csv(rows, headers, chunk_size)
+
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+class ExportMixin:
+    """
+    Adds a GET <list>/export/?output=csv|ndjson action to a viewset
+
+    Viewsets set export_fields and export_filename; list filters still apply.
+    """
+    export_fields: List[Tuple[str, str]] = []
+    export_filename = 'export'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"Unsupported export format '{export_format}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, self.export_fields, self.export_filename, export_format)
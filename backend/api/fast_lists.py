@@ -0,0 +1,134 @@
+"""
+Read-only fast path for large list endpoints
+
+Builds the same JSON shape as TeacherSerializer and ScheduleSerializer straight
+from .values() rows, without model instances or per-field serializer calls.
+Nested teachers, users and groups are fetched once each and shared between
+the rows that reference them.
+"""
+from typing import Dict, Iterable, List
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .models.observation_groups import ObservationGroup
+from .models.teachers import Teacher
+
+# Bound once; these do the same formatting the ModelSerializer fields would
+_datetime = serializers.DateTimeField().to_representation
+_date = serializers.DateField().to_representation
+_time = serializers.TimeField().to_representation
+
+USER_VALUES = ['id', 'name', 'email', 'role', 'status', 'created_at', 'updated_at']
+
+
+def _user(row: Dict, prefix: str = '') -> Dict:
+    return {
+        'id': str(row[f'{prefix}id']),
+        'name': row[f'{prefix}name'],
+        'email': row[f'{prefix}email'],
+        'role': row[f'{prefix}role'],
+        'status': row[f'{prefix}status'],
+        'created_at': _datetime(row[f'{prefix}created_at']),
+        'updated_at': _datetime(row[f'{prefix}updated_at']),
+    }
+
+
+def _teacher_values(queryset):
+    return queryset.values(
+        'id', 'subject', 'grade', 'years_of_experience',
+        *[f'user__{field}' for field in USER_VALUES],
+    )
+
+
+def _teacher(row: Dict) -> Dict:
+    return {
+        'id': row['id'],
+        'user': _user(row, 'user__'),
+        'subject': row['subject'],
+        'grade': row['grade'],
+        'years_of_experience': row['years_of_experience'],
+    }
+
+
+def teacher_list(queryset) -> List[Dict]:
+    """TeacherSerializer(many=True) output for a Teacher queryset, in one query"""
+    return [_teacher(row) for row in _teacher_values(queryset)]
+
+
+def _teachers_by_id(teacher_ids: Iterable[int]) -> Dict[int, Dict]:
+    return {row['id']: _teacher(row) for row in _teacher_values(Teacher.objects.filter(id__in=teacher_ids))}
+
+
+def _groups_by_id(group_ids) -> Dict:
+    if not group_ids:
+        return {}
+
+    members: Dict = {}
+    through = ObservationGroup.teachers.through.objects.filter(observationgroup_id__in=group_ids)
+    for group_id, teacher_id in through.order_by('teacher_id').values_list('observationgroup_id', 'teacher_id'):
+        members.setdefault(group_id, []).append(teacher_id)
+
+    teachers = _teachers_by_id({teacher_id for ids in members.values() for teacher_id in ids})
+
+    groups = {}
+    rows = ObservationGroup.objects.filter(id__in=group_ids).values(
+        'id', 'name', 'note', 'status', 'created_at', 'updated_at',
+        *[f'created_by__{field}' for field in USER_VALUES],
+    )
+    for row in rows:
+        groups[row['id']] = {
+            'id': str(row['id']),
+            'name': row['name'],
+            'note': row['note'],
+            'created_by': _user(row, 'created_by__'),
+            # Members outside the active tenant are left out, as the serializer does
+            'teachers': [teachers[teacher_id] for teacher_id in members.get(row['id'], []) if teacher_id in teachers],
+            'status': row['status'],
+            'created_at': _datetime(row['created_at']),
+            'updated_at': _datetime(row['updated_at']),
+        }
+    return groups
+
+
+def schedule_list(queryset) -> List[Dict]:
+    """ScheduleSerializer(many=True) output for a Schedule queryset, in a fixed number of queries"""
+    rows = list(queryset.values(
+        'id', 'date', 'time', 'duration_minutes', 'observation_type', 'notes', 'status',
+        'created_at', 'updated_at', 'teacher_id', 'observation_group_id',
+    ))
+
+    teachers = _teachers_by_id({row['teacher_id'] for row in rows if row['teacher_id'] is not None})
+    groups = _groups_by_id({row['observation_group_id'] for row in rows if row['observation_group_id'] is not None})
+
+    return [
+        {
+            'id': str(row['id']),
+            'observation_group': groups.get(row['observation_group_id']),
+            'teacher': teachers.get(row['teacher_id']),
+            'date': _date(row['date']),
+            'time': _time(row['time']),
+            'duration_minutes': row['duration_minutes'],
+            'observation_type': row['observation_type'],
+            'notes': row['notes'],
+            'status': row['status'],
+            'created_at': _datetime(row['created_at']),
+            'updated_at': _datetime(row['updated_at']),
+        }
+        for row in rows
+    ]
+
+
+class FastListMixin:
+    """
+    Serves list actions through fast_list, a staticmethod mapping the filtered
+    queryset to serializer-shaped dicts. Paginated viewsets keep the
+    serializer path.
+    """
+    fast_list = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_list is None or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(self.fast_list(queryset))
@@ -0,0 +1,99 @@
+"""
+Password hashing spread across worker processes for bulk account creation
+
+PBKDF2 is CPU-bound and holds the GIL, so threads do not help; a process pool
+hashes one password per core at a time. Small batches are hashed inline,
+where starting workers would cost more than it saves.
+
+Requests share one pool per process, started on first use and capped at
+PASSWORD_HASH_MAX_WORKERS, so concurrent bulk imports queue for the same
+workers instead of each forking a pool of their own.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# Batches smaller than this are hashed in the calling process
+DEFAULT_PARALLEL_THRESHOLD = 16
+DEFAULT_MAX_WORKERS = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(settings_module: str):
+    # Spawned workers (macOS, Windows) start without Django configured
+    import django
+    from django.conf import settings as worker_settings
+    if not worker_settings.configured:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+        django.setup()
+
+
+def _hash_chunk(passwords: Sequence[str]) -> List[str]:
+    return [make_password(password) for password in passwords]
+
+
+def default_workers() -> int:
+    """Size of the shared pool: the CPU count, capped by PASSWORD_HASH_MAX_WORKERS"""
+    cap = getattr(settings, 'PASSWORD_HASH_MAX_WORKERS', DEFAULT_MAX_WORKERS)
+    return max(1, min(os.cpu_count() or 1, cap))
+
+
+def _new_pool(workers: int, mp_context=None) -> ProcessPoolExecutor:
+    settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp_context, initializer=_init_worker, initargs=(settings_module,),
+    )
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked: the pool starts inside a threaded server
+            _pool = _new_pool(default_workers(), multiprocessing.get_context('spawn'))
+            atexit.register(shutdown_pool)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def hash_passwords(passwords: Sequence[str], workers: Optional[int] = None) -> List[str]:
+    """
+    Hash raw passwords with the configured PASSWORD_HASHERS
+
+    Args:
+        passwords: Raw passwords
+        workers: Size of a dedicated pool for this call, as benchmarks use;
+            by default the shared pool is used
+
+    Returns:
+        Encoded hashes in the same order as passwords
+    """
+    passwords = list(passwords)
+    count = workers or default_workers()
+    threshold = getattr(settings, 'PASSWORD_HASH_PARALLEL_THRESHOLD', DEFAULT_PARALLEL_THRESHOLD)
+    if count <= 1 or len(passwords) < threshold:
+        return _hash_chunk(passwords)
+
+    # A few chunks per worker keeps cores busy without paying IPC per password
+    size = max(1, len(passwords) // (count * 4))
+    chunks = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+
+    if workers is None:
+        return [encoded for chunk in shared_pool().map(_hash_chunk, chunks) for encoded in chunk]
+    with _new_pool(workers) as pool:
+        return [encoded for chunk in pool.map(_hash_chunk, chunks) for encoded in chunk]
@@ -0,0 +1,134 @@
+"""
+Idempotency-Key support for unsafe viewset requests
+
+The first POST or PATCH carrying a given Idempotency-Key does the work and its
+response is kept in the cache for IDEMPOTENCY_TTL seconds; retries with the
+same key get that response back without running the view again. A retry
+that arrives while the first request is still running waits for it instead
+of starting a second copy.
+
+Keys are scoped to the client (credentials, session or address), tenant,
+method and path, and bound to the request body: reusing a key with a
+different body is rejected.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from backend.routers import client_key
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENT_METHODS = ('POST', 'PATCH')
+DEFAULT_IDEMPOTENCY_TTL = 60 * 10
+# How long a duplicate waits on the in-flight request, and how long the
+# in-flight marker survives a worker that dies mid-request
+DEFAULT_IDEMPOTENCY_WAIT = 30
+DEFAULT_IDEMPOTENCY_LOCK_TIMEOUT = 120
+POLL_INTERVAL = 0.05
+# Replayed with the body; everything else is recomputed
+REPLAYED_HEADERS = ('Location',)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def idempotency_cache_key(request, key: str) -> str:
+    scope = '|'.join([
+        client_key(request),
+        request.META.get('HTTP_X_TENANT', ''),
+        request.method,
+        request.path,
+        key,
+    ])
+    return 'idempotency:' + hashlib.sha256(scope.encode()).hexdigest()
+
+
+def body_fingerprint(request) -> str:
+    return hashlib.sha256(request.body).hexdigest()
+
+
+class IdempotencyMixin:
+    """Replays the stored response for POST and PATCH retries that repeat an Idempotency-Key"""
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or request.method not in IDEMPOTENT_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+
+        cache_key = idempotency_cache_key(request, key)
+        lock_key = f'{cache_key}:lock'
+        fingerprint = body_fingerprint(request)
+
+        # A second pass covers a first request that ended without a storable response
+        for _ in range(2):
+            stored = cache.get(cache_key)
+            if stored is not None:
+                break
+            if cache.add(lock_key, fingerprint, _setting('IDEMPOTENCY_LOCK_TIMEOUT', DEFAULT_IDEMPOTENCY_LOCK_TIMEOUT)):
+                try:
+                    response = super().dispatch(request, *args, **kwargs)
+                    self._store(cache_key, fingerprint, response)
+                    return response
+                finally:
+                    cache.delete(lock_key)
+            stored = self._wait(cache_key, lock_key)
+            if stored is not None or cache.get(lock_key) is not None:
+                break
+        return self._replay(request, stored, fingerprint, *args, **kwargs)
+
+    def _store(self, cache_key, fingerprint, response):
+        # Server errors and streamed bodies are not kept, so a retry runs again
+        if response.status_code >= 500 or getattr(response, 'streaming', False) or not hasattr(response, 'data'):
+            return
+        cache.set(cache_key, {
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'data': response.data,
+            'headers': {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)},
+        }, _setting('IDEMPOTENCY_TTL', DEFAULT_IDEMPOTENCY_TTL))
+
+    def _wait(self, cache_key, lock_key):
+        deadline = time.monotonic() + _setting('IDEMPOTENCY_WAIT', DEFAULT_IDEMPOTENCY_WAIT)
+        while time.monotonic() < deadline:
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return stored
+            if cache.get(lock_key) is None:
+                # The first request finished without a storable response
+                return None
+            time.sleep(POLL_INTERVAL)
+        return None
+
+    def _replay(self, request, stored, fingerprint, *args, **kwargs):
+        # Same preparation dispatch() gives a handler's response, minus the
+        # handler: a replay still has to pass authentication, permissions and
+        # throttling as the caller is now
+        self.args, self.kwargs = args, kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            self.initial(request, *args, **kwargs)
+            if stored is None:
+                response = Response(
+                    {'error': 'A request with this Idempotency-Key is still in progress; retry it later'},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            elif stored['fingerprint'] != fingerprint:
+                response = Response(
+                    {'error': 'This Idempotency-Key was already used with a different request body'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            else:
+                response = Response(stored['data'], status=stored['status'], headers=stored['headers'])
+                response['Idempotent-Replayed'] = 'true'
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,174 @@
+"""
+In-app notification inbox for T-TESS Bloom
+
+Notifications are fanned out on write with one bulk insert, and each user's
+unread count is kept in the cache and adjusted incrementally so the nav badge
+never has to count rows.
+"""
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import events
+from .models.notifications import Notification
+from .models.observation_groups import ObservationGroup
+from .models.schedule import Schedule
+from .models.teachers import Teacher
+
+DEFAULT_UNREAD_CACHE_TTL = 60 * 60 * 24
+
+
+def unread_cache_key(user_id) -> str:
+    return f'notifications:unread:{user_id}'
+
+
+def _cache_ttl() -> int:
+    return getattr(settings, 'NOTIFICATION_UNREAD_CACHE_TTL', DEFAULT_UNREAD_CACHE_TTL)
+
+
+def _adjust_unread(user_id, delta: int):
+    if not delta:
+        return
+    try:
+        cache.incr(unread_cache_key(user_id), delta)
+    except ValueError:
+        # Not cached yet; the next read counts from the database
+        pass
+
+
+def unread_count(user_id) -> int:
+    """Return the user's unread count, counting from the database only on a cache miss"""
+    key = unread_cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(key, count, _cache_ttl())
+    return max(count, 0)
+
+
+def _publish_on_commit(event_type: str, data: dict, user_id):
+    transaction.on_commit(lambda: events.publish(event_type, data, audience=[user_id]))
+
+
+def _bulk_insert(notifications: List[Notification]) -> List[Notification]:
+    created = Notification.objects.bulk_create(notifications)
+    per_user = {}
+    for notification in created:
+        per_user[notification.user_id] = per_user.get(notification.user_id, 0) + 1
+    for user_id, delta in per_user.items():
+        _adjust_unread(user_id, delta)
+        _publish_on_commit('notification.created', {'count': delta}, user_id)
+    return created
+
+
+def create_notifications(user_ids: Iterable, title: str, message: str, notification_type: str = 'system', related_id: Optional[str] = None, related_type: Optional[str] = None) -> List[Notification]:
+    """Fan one notification out to many users with a single bulk insert"""
+    return _bulk_insert([
+        Notification(
+            user_id=user_id,
+            title=title,
+            message=message,
+            type=notification_type,
+            related_id=related_id,
+            related_type=related_type,
+        )
+        for user_id in dict.fromkeys(user_ids)
+    ])
+
+
+def _schedule_message(schedule: Schedule, group_name: Optional[str] = None) -> str:
+    when = f"{schedule.date.strftime('%B %d, %Y')} at {schedule.time.strftime('%I:%M %p')}"
+    kind = dict(Schedule.OBSERVATION_TYPE_CHOICES).get(schedule.observation_type, schedule.observation_type)
+    if group_name:
+        return f"A {kind.lower()} has been scheduled for {when} ({group_name})."
+    return f"A {kind.lower()} has been scheduled for {when}."
+
+
+def _schedule_notifications(schedules: List[Schedule], title: str, message, notification_type: str = 'observation') -> List[Notification]:
+    """
+    Build one notification per recipient of each schedule
+
+    Schedules for a single teacher notify that teacher; group schedules without
+    a teacher notify every teacher in the group. message maps a schedule and
+    its group name (or None) to the notification text.
+    """
+    group_ids = {s.observation_group_id for s in schedules if s.teacher_id is None and s.observation_group_id}
+    teacher_ids = {s.teacher_id for s in schedules if s.teacher_id}
+
+    group_members = {}
+    for group_id, user_id in ObservationGroup.teachers.through.objects.filter(
+        observationgroup_id__in=group_ids,
+    ).values_list('observationgroup_id', 'teacher__user_id'):
+        group_members.setdefault(group_id, []).append(user_id)
+
+    teacher_users = dict(Teacher.objects.filter(id__in=teacher_ids).values_list('id', 'user_id'))
+
+    notifications = []
+    for schedule in schedules:
+        group_name = schedule.observation_group.name if schedule.observation_group_id else None
+        if schedule.teacher_id:
+            recipients = [teacher_users.get(schedule.teacher_id)]
+        else:
+            recipients = group_members.get(schedule.observation_group_id, [])
+
+        for user_id in dict.fromkeys(recipients):
+            if user_id is None:
+                continue
+            notifications.append(Notification(
+                user_id=user_id,
+                title=title,
+                message=message(schedule, group_name),
+                type=notification_type,
+                related_id=str(schedule.id),
+                related_type='schedule',
+            ))
+    return notifications
+
+
+def notify_schedules_created(schedules: Iterable[Schedule]) -> List[Notification]:
+    """Queue inbox notifications for newly created schedules with one bulk insert"""
+    return _bulk_insert(_schedule_notifications(list(schedules), 'New Observation Scheduled', _schedule_message))
+
+
+STATUS_CHANGE_TITLES = {
+    'Cancelled': 'Observation Cancelled',
+    'Scheduled': 'Observation Rescheduled',
+}
+
+
+def _status_message(status: str):
+    def message(schedule: Schedule, group_name: Optional[str]) -> str:
+        when = f"{schedule.date.strftime('%B %d, %Y')} at {schedule.time.strftime('%I:%M %p')}"
+        suffix = f" ({group_name})" if group_name else ''
+        if status == 'Cancelled':
+            return f"Your observation on {when}{suffix} has been cancelled."
+        return f"Your observation on {when}{suffix} is back on the schedule."
+    return message
+
+
+def notify_status_changed(schedules: Iterable[Schedule], status: str) -> List[Notification]:
+    """
+    Queue inbox notifications for schedules moved to a new status, in one bulk insert
+
+    Completing an observation is not announced; cancelling or reinstating one is.
+    """
+    title = STATUS_CHANGE_TITLES.get(status)
+    if title is None:
+        return []
+    return _bulk_insert(_schedule_notifications(list(schedules), title, _status_message(status)))
+
+
+def mark_read(user_id, notification_ids: Optional[Iterable] = None) -> int:
+    """Mark some or all of a user's unread notifications as read with one UPDATE"""
+    queryset = Notification.objects.filter(user_id=user_id, is_read=False)
+    if notification_ids is not None:
+        queryset = queryset.filter(id__in=list(notification_ids))
+    # update() skips auto_now, so bump updated_at for conditional GET validators
+    updated = queryset.update(is_read=True, updated_at=timezone.now())
+    _adjust_unread(user_id, -updated)
+    if updated:
+        _publish_on_commit('notification.read', {'count': updated}, user_id)
+    return updated
@@ -0,0 +1,32 @@
+import time as timer
+
+from django.core.management.base import BaseCommand
+
+from api.archive import DEFAULT_ARCHIVE_BATCH_SIZE, archivable, archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = 'Move completed and cancelled schedules older than the archive age into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None, help='Defaults to SCHEDULE_ARCHIVE_AFTER_DAYS')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_ARCHIVE_BATCH_SIZE, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['older_than_days'])
+        if options['dry_run']:
+            self.stdout.write(f'{archivable(cutoff).count()} schedules dated before {cutoff} would be archived')
+            return
+
+        started = timer.perf_counter()
+        total = 0
+        while True:
+            moved = archive_batch(cutoff, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'  archived {total}', ending='\r')
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} schedules dated before {cutoff} in {timer.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,96 @@
+import itertools
+import threading
+import time as timer
+
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand, CommandError
+
+from api.email_backends import SenderAccount, ThrottledSMTPBackend
+
+
+class Command(BaseCommand):
+    help = 'Send a burst of messages through the throttled email backend to a local SMTP server and report throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=10000)
+        parser.add_argument('--accounts', type=int, default=4, help='Sender accounts to rotate through')
+        parser.add_argument('--rate', type=float, default=100.0, help='Messages per second per account')
+        parser.add_argument('--burst', type=int, default=10)
+        parser.add_argument('--throttle-every', type=int, default=0, help='Have the local server answer 421 to every Nth message')
+        parser.add_argument('--host', help='Send to this SMTP server instead of starting a local aiosmtpd one')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--max-deviation', type=float, default=None, help='Fail if a full second strays this fraction from the mean rate')
+
+    def handle(self, *args, **options):
+        controller = None
+        counter = itertools.count(1)
+        delivered = []
+        host, port = options['host'], options['port']
+        if not host:
+            controller = self.start_server(port, options['throttle_every'], counter, delivered)
+            host = '127.0.0.1'
+
+        # No password: the stand-in server does not authenticate, so no login is attempted
+        accounts = [
+            SenderAccount(
+                f'sender{index}@example.com', '', from_email=f'sender{index}@example.com',
+                rate=options['rate'], burst=options['burst'], host=host, port=port, use_tls=False,
+            )
+            for index in range(1, options['accounts'] + 1)
+        ]
+        backend = ThrottledSMTPBackend(accounts=accounts, max_wait=None)
+        backend.backoff_base, backend.backoff_max = 0.05, 1.0
+
+        sent_at = []
+        started = timer.perf_counter()
+        try:
+            # One connection per account for the whole run
+            with backend:
+                for index in range(options['messages']):
+                    message = EmailMessage(f'Benchmark {index}', 'Body', None, [f'teacher{index}@example.com'])
+                    if backend.send_messages([message]) != 1:
+                        raise CommandError(f'Message {index} was not sent')
+                    sent_at.append(timer.perf_counter() - started)
+        finally:
+            if controller:
+                controller.stop()
+        elapsed = timer.perf_counter() - started
+
+        windows = [0] * (int(elapsed) + 1)
+        for offset in sent_at:
+            windows[int(offset)] += 1
+        full = windows[:-1] or windows
+        mean = sum(full) / len(full)
+        worst = max(abs(count - mean) / mean for count in full) if mean else 0.0
+        for second, count in enumerate(windows):
+            self.stdout.write(f'second={second:<4} {count:6d} messages')
+        self.stdout.write(
+            f'{len(sent_at)} messages in {elapsed:.1f}s: {len(sent_at) / elapsed:.1f} msg/s '
+            f'(target {options["rate"] * len(accounts):.1f}), worst second {worst:.1%} off the mean'
+        )
+        if controller:
+            self.stdout.write(f'server accepted {len(delivered)}, throttled {next(counter) - 1 - len(delivered)}')
+
+        if options['max_deviation'] is not None and worst > options['max_deviation']:
+            raise CommandError(f'Throughput varied {worst:.1%}, above {options["max_deviation"]:.1%}')
+
+    def start_server(self, port, throttle_every, counter, delivered):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            raise CommandError('aiosmtpd is not installed; install it or pass --host to use another SMTP server')
+
+        lock = threading.Lock()
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                with lock:
+                    number = next(counter)
+                if throttle_every and number % throttle_every == 0:
+                    return '421 4.7.0 Try again later'
+                delivered.append(envelope.mail_from)
+                return '250 OK'
+
+        controller = Controller(Handler(), hostname='127.0.0.1', port=port)
+        controller.start()
+        return controller
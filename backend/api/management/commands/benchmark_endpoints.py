@@ -0,0 +1,171 @@
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from api.benchmarks import DEFAULT_METRIC, DEFAULT_SLACK_MS, DEFAULT_TOLERANCE, ENDPOINTS, compare, run_async, run_sync, uncovered_routes
+from api.archive import archive_batch
+from api.inbox import create_notifications
+from api.models.administrators import Administrator
+from api.models.lesson_plans import LessonPlan, LessonPlanFile, LessonPlanUpload
+from api.models.observation_groups import ObservationGroup
+from api.models.schedule import Schedule
+from api.models.schedule_archive import ArchivedSchedule
+from api.models.teachers import Teacher
+from api.models.user import Users
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'api', 'benchmark_baseline.json')
+# Password of the fixture's login, which the login routes sign in with
+BENCHMARK_PASSWORD = 'benchmark-pass'
+# Login routes should measure the views, not PBKDF2; benchmark_hashing covers hashing
+BENCHMARK_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def build_fixture(scale: int) -> dict:
+    """Seed a data set proportional to scale schedules and return the ids endpoints need"""
+    call_command(
+        'generate_scale_data',
+        schedules=scale,
+        teachers=max(10, scale // 20),
+        administrators=max(2, scale // 500),
+        groups=max(2, scale // 100),
+        stdout=StringIO(),
+    )
+    # Roughly the first third of the seeded window ends up in the archive
+    while archive_batch(date(2024, 11, 1)):
+        pass
+    teacher = Teacher.objects.select_related('user').order_by('id').first()
+    group = ObservationGroup.objects.order_by('id').first()
+    schedule = Schedule.objects.filter(teacher=teacher).order_by('id').first() or Schedule.objects.order_by('id').first()
+
+    content = os.urandom(64 * 1024)
+    name = os.path.join('lesson_plans', 'benchmark.bin')
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, 'lesson_plans'), exist_ok=True)
+    with open(os.path.join(settings.MEDIA_ROOT, name), 'wb') as handle:
+        handle.write(content)
+    stored = LessonPlanFile.objects.create(sha256='0' * 64, file=name, size=len(content))
+    lesson_plan = LessonPlan.objects.create(teacher=teacher, title='Fractions', date=date.today(), file=stored, filename='plan.bin')
+    upload = LessonPlanUpload.objects.create(lesson_plan=lesson_plan, filename='plan.bin', total_size=len(content))
+
+    notifications = create_notifications([teacher.user_id], 'Benchmark', 'Seeded notification')
+    create_notifications([teacher.user_id], 'Reminder', 'Second notification')
+
+    from auths.tokens import RefreshToken
+    email = 'benchmark@example.org'
+    auth_user = User.objects.create_user(username=email, email=email, password=BENCHMARK_PASSWORD)
+    Users.objects.create(name='Benchmark', email=email, role='Administrator')
+    refresh = RefreshToken.for_user(auth_user)
+    registrations = itertools.count()
+
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    return {
+        'user': str(teacher.user_id),
+        'email': email,
+        'password': BENCHMARK_PASSWORD,
+        'teacher': teacher.id,
+        'group': str(group.id),
+        'schedule': str(schedule.id),
+        'archived_schedule': str(ArchivedSchedule.objects.order_by('id').values_list('id', flat=True).first()),
+        'administrator': Administrator.objects.order_by('id').values_list('id', flat=True).first(),
+        'lesson_plan': str(lesson_plan.id),
+        'upload': str(upload.id),
+        'notification': str(notifications[0].id),
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+        'new_refresh': lambda: str(RefreshToken.for_user(auth_user)),
+        'new_email': lambda: f'register-{next(registrations)}@example.org',
+        'plan_start': monday.isoformat(),
+        'plan_end': (monday + timedelta(days=4)).isoformat(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every api and auths route in-process against seeded data and compare with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=int, nargs='+', default=[100, 1000], help='Schedules seeded per run')
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--clients', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi', 'asgi'])
+        parser.add_argument('--only', nargs='+', help='Endpoint names to run, e.g. api:schedule-list')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+        parser.add_argument('--update-baseline', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--metric', choices=['p50', 'p95', 'p99'], default=DEFAULT_METRIC, help='Latency percentile compared with the baseline')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed latency growth as a fraction')
+        parser.add_argument('--slack-ms', type=float, default=DEFAULT_SLACK_MS)
+        parser.add_argument('--output', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        missing = uncovered_routes()
+        if missing:
+            raise CommandError(f"Routes without a benchmark or skip reason: {', '.join(missing)}")
+
+        endpoints = [endpoint for endpoint in ENDPOINTS if not options['only'] or endpoint.name in options['only']]
+        media_root = tempfile.mkdtemp(prefix='benchmark-media-')
+        results = {}
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(ROOT_URLCONF='api.benchmarks', MEDIA_ROOT=media_root, PASSWORD_HASHERS=BENCHMARK_HASHERS, DEBUG=False):
+                for scale in options['scales']:
+                    call_command('flush', interactive=False, verbosity=0)
+                    cache.clear()
+                    fixture = build_fixture(scale)
+                    results[str(scale)] = self._run_scale(scale, endpoints, fixture, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2, sort_keys=True)
+
+        if options['update_baseline']:
+            with open(options['baseline'], 'w') as handle:
+                json.dump(results, handle, indent=2, sort_keys=True)
+                handle.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        if not os.path.exists(options['baseline']):
+            raise CommandError(f"No baseline at {options['baseline']}; run with --update-baseline first")
+        with open(options['baseline']) as handle:
+            baseline = json.load(handle)
+
+        failures = compare(results, baseline, options['tolerance'], options['slack_ms'], options['metric'])
+        for failure in failures:
+            self.stderr.write(failure)
+        if failures:
+            raise CommandError(f'{len(failures)} endpoint regressions against the baseline')
+        self.stdout.write(self.style.SUCCESS('All endpoints are within the baseline budget'))
+
+    def _run_scale(self, scale, endpoints, fixture, options):
+        clients = {'wsgi': (Client(), run_sync), 'asgi': (AsyncClient(), run_async)}
+        self.stdout.write(f'scale={scale}')
+        self.stdout.write(f"  {'endpoint':<36} {'client':<5} {'status':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'queries':>7}")
+
+        results = {}
+        for endpoint in endpoints:
+            for name in options['clients']:
+                client, run = clients[name]
+                cache.clear()
+                summary = run(client, endpoint, fixture, options['iterations'])
+                results.setdefault(endpoint.name, {})[name] = summary
+                queries = '-' if summary['queries'] is None else summary['queries']
+                self.stdout.write(
+                    f"  {endpoint.name:<36} {name:<5} {summary['status']:>6} {summary['p50']:8.2f} "
+                    f"{summary['p95']:8.2f} {summary['p99']:8.2f} {summary['rps']:8.1f} {queries:>7}"
+                )
+        return results
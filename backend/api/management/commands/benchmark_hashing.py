@@ -0,0 +1,40 @@
+import time as timer
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.hashing import default_workers, hash_passwords
+from api.utils import generate_password
+
+
+class Command(BaseCommand):
+    help = 'Measure password hashing throughput as worker processes are added'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--passwords', type=int, default=200)
+        parser.add_argument('--workers', type=int, nargs='+', help='Worker counts to try; defaults to powers of two up to the shared pool size')
+        parser.add_argument('--min-speedup', type=float, default=None, help='Fail if the largest pool is not this many times faster than one worker')
+
+    def handle(self, *args, **options):
+        passwords = [generate_password() for _ in range(options['passwords'])]
+        counts = options['workers']
+        if not counts:
+            counts, workers = [], 1
+            while workers < default_workers():
+                counts.append(workers)
+                workers *= 2
+            counts.append(default_workers())
+
+        baseline = None
+        rate = 0.0
+        for workers in counts:
+            started = timer.perf_counter()
+            hashes = hash_passwords(passwords, workers=workers)
+            elapsed = timer.perf_counter() - started
+            if len(hashes) != len(passwords):
+                raise CommandError(f'Expected {len(passwords)} hashes, got {len(hashes)}')
+            rate = len(passwords) / elapsed
+            baseline = baseline or rate
+            self.stdout.write(f'workers={workers:<3} {rate:8.1f} hashes/s  speedup={rate / baseline:.2f}x')
+
+        if options['min_speedup'] is not None and rate / baseline < options['min_speedup']:
+            raise CommandError(f'Speedup {rate / baseline:.2f}x is below {options["min_speedup"]:.2f}x')
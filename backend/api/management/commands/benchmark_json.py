@@ -0,0 +1,105 @@
+import io
+import random
+import time as timer
+import uuid
+from datetime import datetime, time, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+def _user(rng, native, now):
+    return {
+        'id': uuid.UUID(int=rng.getrandbits(128)) if native else str(uuid.UUID(int=rng.getrandbits(128))),
+        'name': f'Teacher {rng.randint(1, 99999)}',
+        'email': f'teacher{rng.randint(1, 99999)}@example.org',
+        'role': 'Teacher',
+        'status': 'Active',
+        'created_at': now if native else now.isoformat().replace('+00:00', 'Z'),
+        'updated_at': now if native else now.isoformat().replace('+00:00', 'Z'),
+    }
+
+
+def _teacher(rng, native, now):
+    return {
+        'id': rng.randint(1, 100000),
+        'user': _user(rng, native, now),
+        'subject': rng.choice(['Math', 'Science', 'English', 'History']),
+        'grade': rng.choice(['3rd Grade', '7th Grade', '10th Grade']),
+        'years_of_experience': rng.randint(0, 30),
+    }
+
+
+def build_schedules(count, group_size, native, seed=7):
+    """Payloads shaped like ScheduleSerializer output, with a nested group of teachers"""
+    rng = random.Random(seed)
+    now = datetime(2025, 9, 1, 8, 30, 15, 123000, tzinfo=timezone.utc)
+    group_teachers = [_teacher(rng, native, now) for _ in range(group_size)]
+    group = {
+        'id': uuid.UUID(int=rng.getrandbits(128)) if native else str(uuid.UUID(int=rng.getrandbits(128))),
+        'name': 'Fall Walkthroughs',
+        'note': 'Focus on questioning techniques',
+        'created_by': _user(rng, native, now),
+        'teachers': group_teachers,
+        'status': 'Scheduled',
+        'created_at': now if native else now.isoformat().replace('+00:00', 'Z'),
+        'updated_at': now if native else now.isoformat().replace('+00:00', 'Z'),
+    }
+    schedules = []
+    for index in range(count):
+        day = (now + timedelta(days=index % 60)).date()
+        slot = time(8 + index % 7, 30)
+        schedules.append({
+            'id': uuid.UUID(int=rng.getrandbits(128)) if native else str(uuid.UUID(int=rng.getrandbits(128))),
+            'observation_group': group,
+            'teacher': rng.choice(group_teachers),
+            'date': day if native else day.isoformat(),
+            'time': slot if native else slot.isoformat(),
+            'observation_type': 'formal',
+            'notes': 'Bring the lesson plan',
+            'status': 'Scheduled',
+            'created_at': now if native else now.isoformat().replace('+00:00', 'Z'),
+            'updated_at': now if native else now.isoformat().replace('+00:00', 'Z'),
+        })
+    return schedules
+
+
+class Command(BaseCommand):
+    help = 'Compare DRF JSON renderers and parsers on schedule list payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--group-size', type=int, default=10, help='Teachers nested in each schedule\'s group')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def _best(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = timer.perf_counter()
+            result = func()
+            timings.append((timer.perf_counter() - started) * 1000)
+        return min(timings), result
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer falls back to the stdlib'))
+
+        repeat = options['repeat']
+        for label, native in (('serializer output', False), ('native types', True)):
+            data = build_schedules(options['rows'], options['group_size'], native)
+            self.stdout.write(f"{label}: {options['rows']} schedules")
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                try:
+                    best, body = self._best(lambda: renderer.render(data), repeat)
+                except TypeError as e:
+                    self.stdout.write(f"  render {type(renderer).__name__:<18} unsupported: {e}")
+                    continue
+                self.stdout.write(f"  render {type(renderer).__name__:<18} {best:8.2f}ms {len(body):>10} bytes")
+
+        body = FastJSONRenderer().render(build_schedules(options['rows'], options['group_size'], False))
+        for parser in (JSONParser(), FastJSONParser()):
+            best, _ = self._best(lambda: parser.parse(io.BytesIO(body)), repeat)
+            self.stdout.write(f"  parse  {type(parser).__name__:<18} {best:8.2f}ms {len(body):>10} bytes")
@@ -0,0 +1,61 @@
+import random
+import time as timer
+from datetime import date, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.planner import generate_slots, plan_slots
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the observation slot planner on a synthetic group'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teachers', type=int, default=400)
+        parser.add_argument('--days', type=int, default=31)
+        parser.add_argument('--slot-minutes', type=int, default=20)
+        parser.add_argument('--busy-per-teacher', type=int, default=3, help='Existing observations per teacher in the window')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--budget-ms', type=float, default=250.0, help='Fail if the best run exceeds this many milliseconds')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        slot_minutes = options['slot_minutes']
+        start = date.today()
+        end = start + timedelta(days=options['days'] - 1)
+        slots = generate_slots(start, end, time(8, 0), time(15, 0), slot_minutes)
+        if not slots:
+            raise CommandError('The planning window produced no slots')
+
+        teacher_ids = list(range(1, options['teachers'] + 1))
+        # Existing observations run one to three slots long
+        def busy():
+            return (*rng.choice(slots), slot_minutes * rng.randint(1, 3))
+
+        teacher_busy = {
+            teacher_id: [busy() for _ in range(options['busy_per_teacher'])]
+            for teacher_id in teacher_ids
+        }
+        observer_busy = [busy() for _ in range(len(slots) // 10)]
+
+        timings = []
+        for _ in range(options['repeat']):
+            started = timer.perf_counter()
+            assignments, unassigned = plan_slots(
+                teacher_ids,
+                slots,
+                slot_minutes,
+                observer_busy=observer_busy,
+                teacher_busy=teacher_busy,
+            )
+            timings.append((timer.perf_counter() - started) * 1000)
+
+        best = min(timings)
+        self.stdout.write(
+            f"teachers={len(teacher_ids)} slots={len(slots)} assigned={len(assignments)} "
+            f"unassigned={len(unassigned)} best={best:.2f}ms mean={sum(timings) / len(timings):.2f}ms"
+        )
+        if best > options['budget_ms']:
+            raise CommandError(f"Planner took {best:.2f}ms, over the {options['budget_ms']:.0f}ms budget")
+        self.stdout.write(self.style.SUCCESS('Planner is within budget'))
@@ -0,0 +1,167 @@
+import random
+import time as timer
+import uuid
+from datetime import date, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.caching import bump_version
+from api.models.administrators import Administrator
+from api.models.observation_groups import ObservationGroup
+from api.models.schedule import Schedule
+from api.models.teachers import Teacher
+from api.models.tenants import Tenant
+from api.models.user import Users
+
+EMAIL_DOMAIN = 'scale.test'
+SUBJECTS = ['Math', 'Science', 'English', 'History', 'Art', 'Music', 'Physical Education', 'Spanish', 'Computer Science']
+FIRST_NAMES = ['Ada', 'Grace', 'Alan', 'Katherine', 'Edsger', 'Barbara', 'Donald', 'Frances', 'John', 'Radia', 'Tim', 'Margaret']
+LAST_NAMES = ['Lovelace', 'Hopper', 'Turing', 'Johnson', 'Dijkstra', 'Liskov', 'Knuth', 'Allen', 'McCarthy', 'Perlman', 'Berners-Lee', 'Hamilton']
+SLOTS = [time(hour, minute) for hour in range(8, 15) for minute in (0, 30)]
+
+
+class Command(BaseCommand):
+    help = 'Bulk-insert a deterministic synthetic data set for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teachers', type=int, default=1000)
+        parser.add_argument('--administrators', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument('--group-size', type=int, default=8, help='Teachers per observation group')
+        parser.add_argument('--schedules', type=int, default=100000)
+        parser.add_argument('--start-date', type=date.fromisoformat, default=date(2024, 8, 1), help='First day schedules fall on')
+        parser.add_argument('--days', type=int, default=300, help='Length of the schedule window in days')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--tenant', help='Slug of the school the rows belong to, created if missing; defaults to DEFAULT_TENANT_SLUG')
+
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _name(self):
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+
+    def _insert(self, model, objects, label):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[label] = self.counts.get(label, 0) + len(objects)
+        return created
+
+    def _users(self, role, count):
+        slug = role.lower().replace(' ', '-')
+        return self._insert(Users, [
+            Users(
+                id=self._uuid(),
+                name=self._name(),
+                email=f'{slug}-{self.seed}-{index}@{EMAIL_DOMAIN}',
+                role=role,
+                status='Active' if self.rng.random() < 0.95 else 'Inactive',
+                tenant=self.tenant,
+            )
+            for index in range(count)
+        ], 'users')
+
+    def _teacher_ids(self, users):
+        teachers = self._insert(Teacher, [
+            Teacher(
+                user=user,
+                subject=self.rng.choice(SUBJECTS),
+                grade=self.rng.choice(Teacher.grade_level_choices)[0],
+                years_of_experience=self.rng.randint(0, 35),
+                tenant=self.tenant,
+            )
+            for user in users
+        ], 'teachers')
+        if all(teacher.pk for teacher in teachers):
+            return [teacher.pk for teacher in teachers]
+        # Backends without RETURNING leave pks unset
+        by_user = dict(Teacher.objects.filter(user__in=users).values_list('user_id', 'id'))
+        return [by_user[user.id] for user in users]
+
+    def _groups(self, admin_users, teacher_ids, count, size):
+        groups = self._insert(ObservationGroup, [
+            ObservationGroup(
+                id=self._uuid(),
+                name=f'{self.rng.choice(SUBJECTS)} observations {index + 1}',
+                note=None,
+                created_by=self.rng.choice(admin_users),
+                status=self.rng.choices(['Scheduled', 'Completed', 'Cancelled'], weights=[6, 3, 1])[0],
+                tenant=self.tenant,
+            )
+            for index in range(count)
+        ], 'observation groups')
+        members = {group.id: self.rng.sample(teacher_ids, min(size, len(teacher_ids))) for group in groups}
+        Through = ObservationGroup.teachers.through
+        self._insert(Through, [
+            Through(observationgroup_id=group_id, teacher_id=teacher_id)
+            for group_id, ids in members.items() for teacher_id in ids
+        ], 'group memberships')
+        return members
+
+    def _schedules(self, teacher_ids, members, count, start_date, days):
+        group_ids = list(members)
+        # The first 60% of the window is treated as already past
+        past_days = int(days * 0.6)
+        batch = []
+        for _ in range(count):
+            offset = self.rng.randrange(days)
+            if group_ids and self.rng.random() < 0.5:
+                group_id = self.rng.choice(group_ids)
+                teacher_id = self.rng.choice(members[group_id])
+            else:
+                group_id, teacher_id = None, self.rng.choice(teacher_ids)
+            if offset < past_days:
+                status = self.rng.choices(['Completed', 'Cancelled'], weights=[9, 1])[0]
+            else:
+                status = 'Scheduled'
+            batch.append(Schedule(
+                id=self._uuid(),
+                observation_group_id=group_id,
+                teacher_id=teacher_id,
+                date=start_date + timedelta(days=offset),
+                time=self.rng.choice(SLOTS),
+                observation_type='formal' if self.rng.random() < 0.4 else 'walk-through',
+                status=status,
+                notification_sent=status != 'Scheduled',
+            ))
+            if len(batch) == self.batch_size:
+                self._insert(Schedule, batch, 'schedules')
+                batch = []
+        if batch:
+            self._insert(Schedule, batch, 'schedules')
+
+    def _tenant(self, slug):
+        default_slug = getattr(settings, 'DEFAULT_TENANT_SLUG', 'default')
+        slug = slug or default_slug
+        school_name = getattr(settings, 'DEFAULT_TENANT_NAME', 'T-TESS Bloom') if slug == default_slug else slug
+        tenant, _ = Tenant.objects.get_or_create(slug=slug, defaults={'school_name': school_name})
+        return tenant
+
+    def handle(self, *args, **options):
+        self.seed = options['seed']
+        self.rng = random.Random(self.seed)
+        self.batch_size = options['batch_size']
+        self.counts = {}
+
+        if options['teachers'] < 1 or options['administrators'] < 1:
+            raise CommandError('At least one teacher and one administrator are required')
+        if Users.objects.filter(email__endswith=f'-{self.seed}-0@{EMAIL_DOMAIN}').exists():
+            raise CommandError(f'Data for seed {self.seed} already exists; pick another --seed')
+
+        started = timer.perf_counter()
+        with transaction.atomic():
+            # Rows without a tenant would be hidden from every X-Tenant request
+            self.tenant = self._tenant(options['tenant'])
+            admin_users = self._users('Administrator', options['administrators'])
+            self._insert(Administrator, [Administrator(user=user) for user in admin_users], 'administrators')
+            teacher_ids = self._teacher_ids(self._users('Teacher', options['teachers']))
+            members = self._groups(admin_users, teacher_ids, options['groups'], options['group_size'])
+            self._schedules(teacher_ids, members, options['schedules'], options['start_date'], options['days'])
+
+        # bulk_create skips the signals that invalidate cached payloads
+        for model in (Users, Administrator, Teacher, ObservationGroup, Schedule):
+            bump_version(model)
+
+        summary = ', '.join(f'{count} {name}' for name, count in self.counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary} for {self.tenant.slug} in {timer.perf_counter() - started:.1f}s'))
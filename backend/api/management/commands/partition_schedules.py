@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.partitioning import (
+    drop_partition,
+    ensure_partitions,
+    existing_partitions,
+    is_partitioned,
+    partition_table,
+    partition_years,
+    school_year_bounds,
+    supported,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming school-year partitions of api_schedule, or drop old ones (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true', help='Partition the table first if it is still a plain table')
+        parser.add_argument('--ahead', type=int, default=None, help='School years to provision past the current one; defaults to SCHEDULE_PARTITIONS_AHEAD')
+        parser.add_argument('--drop-before', type=int, default=None, metavar='YEAR', help='Drop partitions for school years before this one')
+        parser.add_argument('--list', action='store_true', help='Only list existing partitions')
+
+    def handle(self, *args, **options):
+        if not supported(connection):
+            raise CommandError(f'Partitioning needs PostgreSQL; this database is {connection.vendor}')
+
+        if options['convert'] and partition_table(connection, options['ahead']):
+            self.stdout.write(self.style.SUCCESS('Converted api_schedule to a partitioned table'))
+        if not is_partitioned(connection):
+            raise CommandError('api_schedule is not partitioned; run with --convert or set SCHEDULE_PARTITIONING before migrating')
+
+        if options['list']:
+            for name in existing_partitions(connection):
+                self.stdout.write(name)
+            return
+
+        for year in ensure_partitions(options['ahead'], connection=connection):
+            start, end = school_year_bounds(year)
+            self.stdout.write(f'Created partition for {start} to {end}')
+
+        if options['drop_before'] is not None:
+            for year in partition_years(connection):
+                if year < options['drop_before'] and drop_partition(year, connection):
+                    self.stdout.write(f'Dropped schedules for school year {year}')
+
+        self.stdout.write(self.style.SUCCESS('Partitions are up to date'))
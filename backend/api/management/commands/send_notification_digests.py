@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.digest import send_digests
+
+
+class Command(BaseCommand):
+    help = 'Email each user on digest delivery one summary of their queued notifications; run once a day'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be sent')
+
+    def handle(self, *args, **options):
+        report = send_digests(dry_run=options['dry_run'])
+        verb = 'Would send' if options['dry_run'] else 'Sent'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {report['users']} digests covering {report['items']} notifications"))
+        for email in report['failed']:
+            self.stderr.write(f'  failed: {email}')
@@ -0,0 +1,68 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before it can answer the first request
+STARTUP_SCRIPT = (
+    "import django; django.setup(); "
+    "from backend.wsgi import application; "
+    "import django.urls; django.urls.get_resolver().url_patterns"
+)
+
+# Cold start measures 0.5-0.6s on a development machine; the headroom absorbs
+# slower CI hosts while still catching an eagerly imported heavy dependency
+DEFAULT_BUDGET_MS = 1500.0
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(output: str):
+    """
+    Parse ``python -X importtime`` stderr into (module, self_us, cumulative_us, depth) rows
+
+    Depth is the nesting level of the import; top-level imports have depth 0.
+    """
+    rows = []
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), (len(indent) - 1) // 2))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Measure cold-start import time of the Django project in a fresh interpreter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Slowest modules to list')
+        parser.add_argument('--module', action='append', default=[], help='Extra module to import after setup')
+        parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='Fail when total import time exceeds this many milliseconds')
+
+    def handle(self, *args, **options):
+        script = STARTUP_SCRIPT + ''.join(f'; import {module}' for module in options['module'])
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'backend.settings'))
+
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+
+        rows = parse_importtime(result.stderr)
+        total_ms = sum(row[2] for row in rows if row[3] == 0) / 1000
+
+        self.stdout.write(f"{'module':<60} {'self ms':>9} {'cumul ms':>9}")
+        for name, own, cumulative, _ in sorted(rows, key=lambda row: row[2], reverse=True)[:options['top']]:
+            self.stdout.write(f'{name:<60} {own / 1000:9.1f} {cumulative / 1000:9.1f}')
+        self.stdout.write(f'{len(rows)} modules imported, {total_ms:.1f}ms total')
+
+        budget = options['budget_ms']
+        if total_ms > budget:
+            raise CommandError(f'Startup imports took {total_ms:.1f}ms, over the {budget:.1f}ms budget')
+        self.stdout.write(self.style.SUCCESS(f'Startup is within the {budget:.0f}ms budget'))
@@ -0,0 +1,55 @@
+import asyncio
+import time as timer
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models.user import Users
+from api.supabase_sync import (
+    DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY, DEFAULT_PAGE_SIZE, SupabaseAdmin, reconcile,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create missing Supabase auth users and bring user_profiles in line with local Users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Supabase project URL; defaults to SUPABASE_URL')
+        parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Requests in flight at once')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Profiles per upsert request')
+        parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Report differences without writing')
+
+    def handle(self, *args, **options):
+        url = options['url'] or settings.SUPABASE_URL
+        if not url or not settings.SUPABASE_SERVICE_ROLE_KEY:
+            raise CommandError('SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be configured')
+
+        # Read everything up front; the async part never touches the ORM
+        local_users = list(Users.objects.values_list('email', 'name', 'role'))
+
+        async def run():
+            async with SupabaseAdmin(url, settings.SUPABASE_SERVICE_ROLE_KEY, options['concurrency']) as admin:
+                return await reconcile(
+                    admin, local_users,
+                    batch_size=options['batch_size'],
+                    page_size=options['page_size'],
+                    dry_run=options['dry_run'],
+                )
+
+        started = timer.perf_counter()
+        try:
+            report = asyncio.run(run())
+        except Exception as e:
+            raise CommandError(f'Supabase sync failed: {e}')
+
+        prefix = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(
+            f"{prefix} {report['auth_created']} auth users and upsert {report['profiles_upserted']} profiles "
+            f"({report['local']} local, {report['remote']} in Supabase, {report['remote_only']} Supabase-only) "
+            f"in {timer.perf_counter() - started:.1f}s"
+        )
+        for email, error in report['failed']:
+            self.stderr.write(f'{email}: {error}')
+        if report['failed']:
+            raise CommandError(f"{len(report['failed'])} accounts failed to sync")
@@ -10,29 +10,33 @@ class Migration(migrations.Migration):
         ('api', '0001_initial'),
     ]
 
+    # 0001_initial already creates these columns, so only the migration state is
+    # replayed here; touching the database again breaks migrating a fresh one.
     operations = [
-        # Add teacher field
-        migrations.AddField(
-            model_name='schedule',
-            name='teacher',
-            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='api.teacher'),
-        ),
-        # Add observation_type field
-        migrations.AddField(
-            model_name='schedule',
-            name='observation_type',
-            field=models.CharField(choices=[('formal', 'Formal Observation'), ('walk-through', 'Walk-through')], default='formal', max_length=20),
-        ),
-        # Make observation_group nullable
-        migrations.AlterField(
-            model_name='schedule',
-            name='observation_group',
-            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='api.observationgroup'),
-        ),
-        # Update status choices
-        migrations.AlterField(
-            model_name='schedule',
-            name='status',
-            field=models.CharField(choices=[('Scheduled', 'Scheduled'), ('Completed', 'Completed'), ('Cancelled', 'Cancelled')], default='Scheduled', max_length=255),
-        ),
+        migrations.SeparateDatabaseAndState(state_operations=[
+            # Add teacher field
+            migrations.AddField(
+                model_name='schedule',
+                name='teacher',
+                field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='api.teacher'),
+            ),
+            # Add observation_type field
+            migrations.AddField(
+                model_name='schedule',
+                name='observation_type',
+                field=models.CharField(choices=[('formal', 'Formal Observation'), ('walk-through', 'Walk-through')], default='formal', max_length=20),
+            ),
+            # Make observation_group nullable
+            migrations.AlterField(
+                model_name='schedule',
+                name='observation_group',
+                field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='api.observationgroup'),
+            ),
+            # Update status choices
+            migrations.AlterField(
+                model_name='schedule',
+                name='status',
+                field=models.CharField(choices=[('Scheduled', 'Scheduled'), ('Completed', 'Completed'), ('Cancelled', 'Cancelled')], default='Scheduled', max_length=255),
+            ),
+        ]),
     ]
\ No newline at end of file
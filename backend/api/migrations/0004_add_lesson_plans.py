@@ -0,0 +1,79 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:52
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_add_notification_fields_to_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonPlanFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to='lesson_plans/')),
+                ('size', models.BigIntegerField()),
+                ('content_type', models.CharField(default='application/octet-stream', max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Lesson Plan File',
+                'verbose_name_plural': 'Lesson Plan Files',
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonPlan',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('subject', models.CharField(blank=True, max_length=255, null=True)),
+                ('grade', models.CharField(blank=True, max_length=255, null=True)),
+                ('date', models.DateField()),
+                ('objectives', models.TextField(blank=True, null=True)),
+                ('materials', models.TextField(blank=True, null=True)),
+                ('activities', models.TextField(blank=True, null=True)),
+                ('assessment', models.TextField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('is_submitted', models.BooleanField(default=False)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('filename', models.CharField(blank=True, max_length=255, null=True)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lesson_plans', to='api.teacher')),
+                ('file', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='lesson_plans', to='api.lessonplanfile')),
+            ],
+            options={
+                'verbose_name': 'Lesson Plan',
+                'verbose_name_plural': 'Lesson Plans',
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonPlanUpload',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('content_type', models.CharField(default='application/octet-stream', max_length=255)),
+                ('total_size', models.BigIntegerField()),
+                ('received_bytes', models.BigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('Uploading', 'Uploading'), ('Complete', 'Complete')], default='Uploading', max_length=20)),
+                ('lesson_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='api.lessonplan')),
+            ],
+            options={
+                'verbose_name': 'Lesson Plan Upload',
+                'verbose_name_plural': 'Lesson Plan Uploads',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='lessonplan',
+            index=models.Index(fields=['teacher', 'date'], name='api_lessonp_teacher_659d21_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-19 16:53
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_add_lesson_plans'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('type', models.CharField(choices=[('observation', 'Observation'), ('feedback', 'Feedback'), ('system', 'System'), ('reminder', 'Reminder')], default='system', max_length=20)),
+                ('is_read', models.BooleanField(default=False)),
+                ('related_id', models.CharField(blank=True, help_text='ID of the related record, e.g. a schedule', max_length=255, null=True)),
+                ('related_type', models.CharField(blank=True, help_text='Type of the related record', max_length=50, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='api.users')),
+            ],
+            options={
+                'verbose_name': 'Notification',
+                'verbose_name_plural': 'Notifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'is_read'], name='api_notific_user_id_16328d_idx'), models.Index(fields=['user', '-created_at'], name='api_notific_user_id_48bbdc_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_add_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSchedule',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('observation_type', models.CharField(choices=[('formal', 'Formal Observation'), ('walk-through', 'Walk-through')], default='formal', max_length=20)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('Scheduled', 'Scheduled'), ('Completed', 'Completed'), ('Cancelled', 'Cancelled')], max_length=255)),
+                ('notification_sent', models.BooleanField(default=False)),
+                ('reminder_sent', models.BooleanField(default=False)),
+                ('notification_sent_at', models.DateTimeField(blank=True, null=True)),
+                ('reminder_sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('observation_group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_schedules', to='api.observationgroup')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_schedules', to='api.teacher')),
+            ],
+            options={
+                'verbose_name': 'Archived Schedule',
+                'verbose_name_plural': 'Archived Schedules',
+                'ordering': ['-date', '-time'],
+                'indexes': [models.Index(fields=['date'], name='api_archive_date_85b2e5_idx'), models.Index(fields=['teacher', 'date'], name='api_archive_teacher_3313b6_idx')],
+            },
+        ),
+    ]
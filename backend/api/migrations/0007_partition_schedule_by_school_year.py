@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition(apps, schema_editor):
+    # Opt-in and PostgreSQL only; other databases keep the plain table
+    if not getattr(settings, 'SCHEDULE_PARTITIONING', False):
+        return
+    from api.partitioning import partition_table
+    partition_table(schema_editor.connection)
+
+
+def unpartition(apps, schema_editor):
+    from api.partitioning import unpartition_table
+    unpartition_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_add_schedule_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:21
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_partition_schedule_by_school_year'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tenant',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('slug', models.SlugField(help_text='Sent as the X-Tenant header by clients without a tenant-bound login', max_length=100, unique=True)),
+                ('school_name', models.CharField(max_length=255)),
+                ('district', models.CharField(blank=True, default='', max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Tenant',
+                'verbose_name_plural': 'Tenants',
+                'ordering': ['district', 'school_name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='observationgroup',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='observation_groups', to='api.tenant'),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='teachers', to='api.tenant'),
+        ),
+        migrations.AddField(
+            model_name='users',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='api.tenant'),
+        ),
+        migrations.AddIndex(
+            model_name='observationgroup',
+            index=models.Index(fields=['tenant', 'status'], name='api_group_tenant_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='observationgroup',
+            index=models.Index(fields=['tenant', 'created_at'], name='api_group_tenant_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['tenant', 'grade'], name='api_teacher_tenant_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['tenant', 'subject'], name='api_teacher_tenant_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='users',
+            index=models.Index(fields=['tenant', 'role'], name='api_users_tenant_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='users',
+            index=models.Index(fields=['tenant', 'created_at'], name='api_users_tenant_created_idx'),
+        ),
+    ]
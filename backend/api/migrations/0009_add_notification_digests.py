@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:26
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_add_tenants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='notification_delivery',
+            field=models.CharField(choices=[('immediate', 'Immediate'), ('digest', 'Daily digest')], default='immediate', help_text='Email each notification as it happens, or once a day', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PendingNotification',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('observation_scheduled', 'Observation scheduled')], default='observation_scheduled', max_length=50)),
+                ('schedule_id', models.UUIDField(blank=True, null=True)),
+                ('data', models.JSONField(default=dict, help_text='Rendered details, frozen when the notification was queued')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_notifications', to='api.users')),
+            ],
+            options={
+                'verbose_name': 'Pending Notification',
+                'verbose_name_plural': 'Pending Notifications',
+                'ordering': ['user', 'created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='api_pending_user_created_idx')],
+            },
+        ),
+    ]
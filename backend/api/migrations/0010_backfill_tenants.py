@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import migrations, models
+
+TENANT_OWNED = ('Users', 'Teacher', 'ObservationGroup')
+
+
+def backfill(apps, schema_editor):
+    # Rows from before tenancy belong to the school the deployment already served
+    owned = [apps.get_model('api', name) for name in TENANT_OWNED]
+    if not any(model.objects.filter(tenant__isnull=True).exists() for model in owned):
+        return
+    Tenant = apps.get_model('api', 'Tenant')
+    tenant, _ = Tenant.objects.get_or_create(
+        slug=getattr(settings, 'DEFAULT_TENANT_SLUG', 'default'),
+        defaults={'school_name': getattr(settings, 'DEFAULT_TENANT_NAME', 'T-TESS Bloom')},
+    )
+    for model in owned:
+        model.objects.filter(tenant__isnull=True).update(tenant=tenant)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_add_notification_digests'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tenant',
+            name='slug',
+            field=models.SlugField(help_text='Sent as the X-Tenant header by staff without a tenant-bound login', max_length=100, unique=True),
+        ),
+        # Not reversed: the assignments are indistinguishable from ones made by hand
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:47
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_backfill_tenants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedschedule',
+            name='duration_minutes',
+            field=models.PositiveSmallIntegerField(default=30),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='duration_minutes',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Length of the observation in minutes', validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(240)]),
+        ),
+    ]
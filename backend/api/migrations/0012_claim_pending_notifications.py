@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_add_schedule_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingnotification',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='pendingnotification',
+            name='claimed_by',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from backend.basemodel import TimeBaseModel
+from django.db import models
+from .user import Users
+import uuid
+
+
+class PendingNotification(TimeBaseModel):
+    """An email held back for a user's next daily digest; deleted once it is sent"""
+    KIND_CHOICES = [
+        ('observation_scheduled', 'Observation scheduled'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(Users, on_delete=models.CASCADE, related_name='pending_notifications')
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES, default='observation_scheduled')
+    # Not a foreign key: schedules may be archived or live in a partitioned table
+    schedule_id = models.UUIDField(null=True, blank=True)
+    data = models.JSONField(default=dict, help_text="Rendered details, frozen when the notification was queued")
+    # Set by the digest run that is sending the row, so concurrent runs skip it
+    claimed_by = models.UUIDField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.name} - {self.get_kind_display()}"
+
+    class Meta:
+        verbose_name = 'Pending Notification'
+        verbose_name_plural = 'Pending Notifications'
+        ordering = ['user', 'created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='api_pending_user_created_idx'),
+        ]
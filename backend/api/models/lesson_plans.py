@@ -0,0 +1,71 @@
+from backend.basemodel import TimeBaseModel
+from django.db import models
+from .teachers import Teacher
+import uuid
+
+
+class LessonPlanFile(TimeBaseModel):
+    """Uploaded file content, stored once per distinct SHA-256 digest"""
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='lesson_plans/', max_length=255)
+    size = models.BigIntegerField()
+    content_type = models.CharField(max_length=255, default='application/octet-stream')
+
+    def __str__(self):
+        return self.sha256
+
+    class Meta:
+        verbose_name = 'Lesson Plan File'
+        verbose_name_plural = 'Lesson Plan Files'
+
+
+class LessonPlan(TimeBaseModel):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, related_name='lesson_plans')
+    title = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255, blank=True, null=True)
+    grade = models.CharField(max_length=255, blank=True, null=True)
+    date = models.DateField()
+    objectives = models.TextField(blank=True, null=True)
+    materials = models.TextField(blank=True, null=True)
+    activities = models.TextField(blank=True, null=True)
+    assessment = models.TextField(blank=True, null=True)
+    notes = models.TextField(blank=True, null=True)
+    is_submitted = models.BooleanField(default=False)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+
+    # Attached document, shared between plans that uploaded identical content
+    file = models.ForeignKey(LessonPlanFile, on_delete=models.PROTECT, null=True, blank=True, related_name='lesson_plans')
+    filename = models.CharField(max_length=255, blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.title} - {self.date}"
+
+    class Meta:
+        verbose_name = 'Lesson Plan'
+        verbose_name_plural = 'Lesson Plans'
+        indexes = [
+            models.Index(fields=['teacher', 'date']),
+        ]
+
+
+class LessonPlanUpload(TimeBaseModel):
+    STATUS_CHOICES = [
+        ('Uploading', 'Uploading'),
+        ('Complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    lesson_plan = models.ForeignKey(LessonPlan, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255, default='application/octet-stream')
+    total_size = models.BigIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Uploading')
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+    class Meta:
+        verbose_name = 'Lesson Plan Upload'
+        verbose_name_plural = 'Lesson Plan Uploads'
@@ -0,0 +1,34 @@
+from backend.basemodel import TimeBaseModel
+from django.db import models
+from .user import Users
+import uuid
+
+
+class Notification(TimeBaseModel):
+    TYPE_CHOICES = [
+        ('observation', 'Observation'),
+        ('feedback', 'Feedback'),
+        ('system', 'System'),
+        ('reminder', 'Reminder'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(Users, on_delete=models.CASCADE, related_name='notifications')
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='system')
+    is_read = models.BooleanField(default=False)
+    related_id = models.CharField(max_length=255, blank=True, null=True, help_text="ID of the related record, e.g. a schedule")
+    related_type = models.CharField(max_length=50, blank=True, null=True, help_text="Type of the related record")
+
+    def __str__(self):
+        return f"{self.user.name} - {self.title}"
+
+    class Meta:
+        verbose_name = 'Notification'
+        verbose_name_plural = 'Notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read']),
+            models.Index(fields=['user', '-created_at']),
+        ]
@@ -1,6 +1,8 @@
 from backend.basemodel import TimeBaseModel
 from django.db import models
+from api.tenancy import TenantManager
 from .teachers import Teacher
+from .tenants import Tenant
 from .user import Users
 import uuid
 
@@ -18,6 +20,11 @@ class ObservationGroup(TimeBaseModel):
     created_by = models.ForeignKey(Users, on_delete=models.CASCADE, related_name='created_groups')
     teachers = models.ManyToManyField(Teacher, related_name='observation_groups')
     status = models.CharField(max_length=255, choices=STATUS_CHOICES, default='Scheduled')
+    tenant = models.ForeignKey(Tenant, on_delete=models.PROTECT, null=True, blank=True, related_name='observation_groups', db_index=False)
+
+    # Scoped to the active tenant; all_tenants sees every row
+    objects = TenantManager()
+    all_tenants = models.Manager()
 
     def __str__(self):
         return self.name
@@ -25,3 +32,7 @@ class ObservationGroup(TimeBaseModel):
     class Meta:
         verbose_name = 'Observation Group'
         verbose_name_plural = 'Observation Groups'
+        indexes = [
+            models.Index(fields=['tenant', 'status'], name='api_group_tenant_status_idx'),
+            models.Index(fields=['tenant', 'created_at'], name='api_group_tenant_created_idx'),
+        ]
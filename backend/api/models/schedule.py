@@ -1,4 +1,5 @@
 from backend.basemodel import TimeBaseModel
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from .observation_groups import ObservationGroup
 from .teachers import Teacher
@@ -21,6 +22,11 @@ class Schedule(TimeBaseModel):
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, null=True, blank=True, related_name='schedules')
     date = models.DateField()
     time = models.TimeField()
+    duration_minutes = models.PositiveSmallIntegerField(
+        default=30,
+        validators=[MinValueValidator(5), MaxValueValidator(240)],
+        help_text="Length of the observation in minutes",
+    )
     observation_type = models.CharField(max_length=20, choices=OBSERVATION_TYPE_CHOICES, default='formal')
     notes = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=255, choices=STATUS_CHOICES, default='Scheduled')
@@ -0,0 +1,41 @@
+from django.db import models
+from .observation_groups import ObservationGroup
+from .schedule import Schedule
+from .teachers import Teacher
+
+
+class ArchivedSchedule(models.Model):
+    """
+    Completed or cancelled schedules moved out of the live Schedule table
+
+    Rows keep their original id and timestamps. Related teachers and groups
+    may be deleted later without losing the history.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    observation_group = models.ForeignKey(ObservationGroup, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_schedules')
+    teacher = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_schedules')
+    date = models.DateField()
+    time = models.TimeField()
+    duration_minutes = models.PositiveSmallIntegerField(default=30)
+    observation_type = models.CharField(max_length=20, choices=Schedule.OBSERVATION_TYPE_CHOICES, default='formal')
+    notes = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=255, choices=Schedule.STATUS_CHOICES)
+    notification_sent = models.BooleanField(default=False)
+    reminder_sent = models.BooleanField(default=False)
+    notification_sent_at = models.DateTimeField(null=True, blank=True)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived schedule - {self.date}"
+
+    class Meta:
+        verbose_name = 'Archived Schedule'
+        verbose_name_plural = 'Archived Schedules'
+        ordering = ['-date', '-time']
+        indexes = [
+            models.Index(fields=['date']),
+            models.Index(fields=['teacher', 'date']),
+        ]
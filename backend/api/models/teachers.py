@@ -1,5 +1,7 @@
 from backend.basemodel import TimeBaseModel
 from django.db import models
+from api.tenancy import TenantManager
+from .tenants import Tenant
 from .user import Users
 
 class Teacher(TimeBaseModel):
@@ -24,6 +26,11 @@ class Teacher(TimeBaseModel):
     subject=models.CharField(max_length=255)
     grade=models.CharField(max_length=255,choices=grade_level_choices)
     years_of_experience=models.IntegerField(default=0)
+    tenant = models.ForeignKey(Tenant, on_delete=models.PROTECT, null=True, blank=True, related_name='teachers', db_index=False)
+
+    # Scoped to the active tenant; all_tenants sees every row
+    objects = TenantManager()
+    all_tenants = models.Manager()
 
 
     def __str__(self):
@@ -32,5 +39,9 @@ class Teacher(TimeBaseModel):
     class Meta:
         verbose_name = 'Teacher'
         verbose_name_plural = 'Teachers'
+        indexes = [
+            models.Index(fields=['tenant', 'grade'], name='api_teacher_tenant_grade_idx'),
+            models.Index(fields=['tenant', 'subject'], name='api_teacher_tenant_subject_idx'),
+        ]
 
 
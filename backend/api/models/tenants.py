@@ -0,0 +1,19 @@
+from backend.basemodel import TimeBaseModel
+from django.db import models
+import uuid
+
+
+class Tenant(TimeBaseModel):
+    """A school; schools in the same district share the district name"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    slug = models.SlugField(max_length=100, unique=True, help_text="Sent as the X-Tenant header by staff without a tenant-bound login")
+    school_name = models.CharField(max_length=255)
+    district = models.CharField(max_length=255, blank=True, default='')
+
+    def __str__(self):
+        return f"{self.school_name} ({self.district})" if self.district else self.school_name
+
+    class Meta:
+        verbose_name = 'Tenant'
+        verbose_name_plural = 'Tenants'
+        ordering = ['district', 'school_name']
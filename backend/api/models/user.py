@@ -1,5 +1,7 @@
 from backend.basemodel import TimeBaseModel
 from django.db import models
+from api.tenancy import TenantManager
+from .tenants import Tenant
 import uuid
 
 class Users(TimeBaseModel):
@@ -13,11 +15,29 @@ class Users(TimeBaseModel):
         ('Active', 'Active'),
         ('Inactive', 'Inactive'),
     ]
+    DELIVERY_CHOICES = [
+        ('immediate', 'Immediate'),
+        ('digest', 'Daily digest'),
+    ]
 
     id= models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name=models.CharField(max_length=255)
     email=models.EmailField(unique=True)
     role=models.CharField(max_length=255,choices=ROLE_CHOICES)
     status=models.CharField(max_length=255,choices=USER_STATUS_CHOICES,default='Active')
+    notification_delivery = models.CharField(max_length=20, choices=DELIVERY_CHOICES, default='immediate', help_text="Email each notification as it happens, or once a day")
+    tenant = models.ForeignKey(Tenant, on_delete=models.PROTECT, null=True, blank=True, related_name='users', db_index=False)
+
+    # Scoped to the active tenant; all_tenants sees every row
+    objects = TenantManager()
+    all_tenants = models.Manager()
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    class Meta:
+        # Tenant first, so each school's lookups stay within its own slice of the index
+        indexes = [
+            models.Index(fields=['tenant', 'role'], name='api_users_tenant_role_idx'),
+            models.Index(fields=['tenant', 'created_at'], name='api_users_tenant_created_idx'),
+        ]
@@ -17,7 +17,8 @@ class NotificationService:
         teacher_email: str,
         teacher_name: str,
         observation_data: Dict,
-        observer_name: str = None
+        observer_name: str = None,
+        connection=None
     ) -> bool:
         """
         Send email notification when an observation is scheduled
@@ -27,6 +28,7 @@ class NotificationService:
             teacher_name: Teacher's full name
             observation_data: Dictionary containing observation details
             observer_name: Name of the observer/administrator
+            connection: Open email connection to send over; a new one by default
             
         Returns:
             bool: True if email sent successfully, False otherwise
@@ -187,6 +189,7 @@ If you have any questions, please contact your administrator.
                 recipient_list=[teacher_email],
                 html_message=html_message,
                 fail_silently=False,
+                connection=connection,
             )
             
             logger.info(f"Observation scheduled notification sent to {teacher_email}")
@@ -0,0 +1,234 @@
+"""
+Range partitioning of the schedule table by school year on PostgreSQL
+
+api_schedule becomes a partitioned parent with one child table per school
+year (api_schedule_y2024 holds 2024-07-01 up to 2025-07-01 with the default
+start month) plus a default partition for anything outside them. Queries
+filtered on date only touch the matching years, and dropping a year is a
+DETACH + DROP instead of a large DELETE.
+
+Other databases keep the plain table; every helper is a no-op there.
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection as default_connection, transaction
+
+TABLE = 'api_schedule'
+LEGACY_TABLE = 'api_schedule_unpartitioned'
+DEFAULT_PARTITION = 'api_schedule_default'
+PARTITIONED_PRIMARY_KEY = 'api_schedule_partitioned_pkey'
+DEFAULT_SCHOOL_YEAR_START_MONTH = 7
+DEFAULT_PARTITIONS_AHEAD = 2
+
+# Indexes and foreign keys recreated on the partitioned parent; PostgreSQL
+# cascades them to every partition, including ones created later
+PARENT_INDEXES = [
+    ('api_schedule_teacher_id_idx', 'teacher_id'),
+    ('api_schedule_observation_group_id_idx', 'observation_group_id'),
+    ('api_schedule_date_idx', 'date'),
+]
+PARENT_FOREIGN_KEYS = [
+    ('api_schedule_teacher_id_fk', 'teacher_id', 'api_teacher', 'id'),
+    ('api_schedule_observation_group_id_fk', 'observation_group_id', 'api_observationgroup', 'id'),
+]
+
+
+def school_year_start_month() -> int:
+    return getattr(settings, 'SCHOOL_YEAR_START_MONTH', DEFAULT_SCHOOL_YEAR_START_MONTH)
+
+
+def school_year(day: date) -> int:
+    """School year a date belongs to, named after the calendar year it starts in"""
+    return day.year if day.month >= school_year_start_month() else day.year - 1
+
+
+def school_year_bounds(year: int) -> Tuple[date, date]:
+    """Inclusive start and exclusive end of a school year"""
+    month = school_year_start_month()
+    return date(year, month, 1), date(year + 1, month, 1)
+
+
+def partition_name(year: int) -> str:
+    return f'{TABLE}_y{year}'
+
+
+def partition_years(connection=None) -> List[int]:
+    """School years that currently have their own partition"""
+    prefix = partition_name('')
+    return sorted(int(name[len(prefix):]) for name in existing_partitions(connection) if name.startswith(prefix))
+
+
+def supported(connection=None) -> bool:
+    return (connection or default_connection).vendor == 'postgresql'
+
+
+def is_partitioned(connection=None) -> bool:
+    connection = connection or default_connection
+    if not supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND c.relnamespace = to_regnamespace(current_schema())::oid",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def existing_partitions(connection=None) -> List[str]:
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s ORDER BY child.relname",
+            [TABLE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def create_partition(year: int, connection=None) -> bool:
+    """
+    Create the partition for one school year if it does not exist
+
+    Rows for that year already sitting in the default partition are moved
+    into the new partition, since PostgreSQL refuses to create a partition
+    whose range the default partition still holds rows for.
+
+    Returns:
+        True if a partition was created
+    """
+    connection = connection or default_connection
+    name = partition_name(year)
+    if name in existing_partitions(connection):
+        return False
+
+    start, end = school_year_bounds(year)
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(DEFAULT_PARTITION)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s RETURNING *) '
+            f'INSERT INTO {quote(TABLE)} SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(DEFAULT_PARTITION)} DEFAULT')
+    return True
+
+
+def ensure_partitions(ahead: Optional[int] = None, today: Optional[date] = None, connection=None) -> List[int]:
+    """
+    Make sure partitions exist for the current school year and `ahead` years after it
+
+    Returns:
+        School years whose partitions were created
+    """
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return []
+    ahead = ahead if ahead is not None else getattr(settings, 'SCHEDULE_PARTITIONS_AHEAD', DEFAULT_PARTITIONS_AHEAD)
+    current = school_year(today or date.today())
+    return [year for year in range(current, current + ahead + 1) if create_partition(year, connection)]
+
+
+def drop_partition(year: int, connection=None) -> bool:
+    """Detach and drop one school year of schedules; a metadata operation, not a DELETE"""
+    connection = connection or default_connection
+    name = partition_name(year)
+    if name not in existing_partitions(connection):
+        return False
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}')
+        cursor.execute(f'DROP TABLE {quote(name)}')
+    return True
+
+
+def partition_table(connection=None, ahead: Optional[int] = None) -> bool:
+    """
+    Convert the plain api_schedule table into a partitioned one, keeping its rows
+
+    The old table is renamed, an empty partitioned parent takes its name with
+    a primary key of (id, date) as PostgreSQL requires, partitions are created
+    for every school year present plus the years ahead, and the rows are
+    copied across before the old table is dropped. Nothing references
+    api_schedule by foreign key, so no other table needs to change.
+
+    Returns:
+        True if the table was converted, False if it already was or the
+        database is not PostgreSQL
+    """
+    connection = connection or default_connection
+    if not supported(connection) or is_partitioned(connection):
+        return False
+
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} RENAME TO {quote(LEGACY_TABLE)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(TABLE)} (LIKE {quote(LEGACY_TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (date)'
+        )
+        # The renamed table still owns the api_schedule_pkey index name
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(PARTITIONED_PRIMARY_KEY)} PRIMARY KEY (id, date)')
+        for index_name, column in PARENT_INDEXES:
+            cursor.execute(f'CREATE INDEX {quote(index_name)} ON {quote(TABLE)} ({quote(column)})')
+        for constraint, column, target, target_column in PARENT_FOREIGN_KEYS:
+            cursor.execute(
+                f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(constraint)} FOREIGN KEY ({quote(column)}) '
+                f'REFERENCES {quote(target)} ({quote(target_column)}) DEFERRABLE INITIALLY DEFERRED'
+            )
+        cursor.execute(f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {quote(TABLE)} DEFAULT')
+
+        cursor.execute(f'SELECT MIN(date), MAX(date) FROM {quote(LEGACY_TABLE)}')
+        first, last = cursor.fetchone()
+        today = date.today()
+        ahead = ahead if ahead is not None else getattr(settings, 'SCHEDULE_PARTITIONS_AHEAD', DEFAULT_PARTITIONS_AHEAD)
+        start_year = school_year(min(first or today, today))
+        end_year = max(school_year(last or today), school_year(today) + ahead)
+        for year in range(start_year, end_year + 1):
+            start, end = school_year_bounds(year)
+            cursor.execute(
+                f'CREATE TABLE {quote(partition_name(year))} PARTITION OF {quote(TABLE)} FOR VALUES FROM (%s) TO (%s)',
+                [start, end],
+            )
+
+        cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(LEGACY_TABLE)}')
+        cursor.execute(f'DROP TABLE {quote(LEGACY_TABLE)}')
+    return True
+
+
+def unpartition_table(connection=None) -> bool:
+    """Reverse of partition_table: copy every partition back into a plain table"""
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return False
+
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {quote(LEGACY_TABLE)} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(f'INSERT INTO {quote(LEGACY_TABLE)} SELECT * FROM {quote(TABLE)}')
+        cursor.execute(f'DROP TABLE {quote(TABLE)} CASCADE')
+        cursor.execute(f'ALTER TABLE {quote(LEGACY_TABLE)} RENAME TO {quote(TABLE)}')
+        cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY (id)')
+        for index_name, column in PARENT_INDEXES:
+            cursor.execute(f'CREATE INDEX {quote(index_name)} ON {quote(TABLE)} ({quote(column)})')
+        for constraint, column, target, target_column in PARENT_FOREIGN_KEYS:
+            cursor.execute(
+                f'ALTER TABLE {quote(TABLE)} ADD CONSTRAINT {quote(constraint)} FOREIGN KEY ({quote(column)}) '
+                f'REFERENCES {quote(target)} ({quote(target_column)}) DEFERRABLE INITIALLY DEFERRED'
+            )
+    return True
+
+
+def ensure_partitions_after_migrate(sender, using='default', **kwargs):
+    """post_migrate hook: keep future school years provisioned on partitioned databases"""
+    from django.db import connections
+    ensure_partitions(connection=connections[using])
@@ -0,0 +1,105 @@
+"""
+Role-based permissions for the api viewsets
+
+Roles live on api Users rows, linked to auth users only by email. The link is
+resolved through the per-process auths user cache: bearer-token requests
+arrive with request.user.app_user already attached by CachedJWTAuthentication,
+and session or basic auth users are resolved once and cached the same way.
+The auths signal handlers drop an entry whenever its Users row is saved or
+deleted, so a role change applies on the next request, and a cached request
+adds no query.
+
+Requests without credentials are let through until API_ENFORCE_ROLES is set,
+so clients that do not send tokens yet keep working; authenticated requests
+are always held to their role.
+"""
+import copy
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+from rest_framework_simplejwt.settings import api_settings
+
+from auths.authentication import get_app_user, user_cache
+
+ADMINISTRATOR = 'Administrator'
+TEACHER = 'Teacher'
+SUPER_USER = 'Super User'
+ALL_ROLES = (ADMINISTRATOR, TEACHER, SUPER_USER)
+STAFF_ROLES = (ADMINISTRATOR, SUPER_USER)
+
+
+def app_user(user):
+    """The Users row linked to an authenticated user, from the user cache when possible"""
+    if hasattr(user, 'app_user'):
+        return user.app_user
+    key = str(getattr(user, api_settings.USER_ID_FIELD))
+    cached = user_cache.get(key)
+    if cached is None:
+        cached = copy.copy(user)
+        cached.app_user = get_app_user(user)
+        user_cache.set(key, cached)
+    user.app_user = cached.app_user
+    return user.app_user
+
+
+def user_role(user):
+    """Role of an authenticated user, or None for anonymous, unlinked and inactive users"""
+    if not user or not user.is_authenticated:
+        return None
+    if user.is_superuser:
+        return SUPER_USER
+    linked = app_user(user)
+    if linked is None or linked.status != 'Active':
+        return None
+    return linked.role
+
+
+def is_anonymous_allowed(user) -> bool:
+    """Whether a request without credentials gets through; only while API_ENFORCE_ROLES is off"""
+    return (not user or not user.is_authenticated) and not getattr(settings, 'API_ENFORCE_ROLES', False)
+
+
+def is_staff(user) -> bool:
+    """Whether a user is an administrator or super user"""
+    return user_role(user) in STAFF_ROLES
+
+
+class RolePermission(BasePermission):
+    """Allows read_roles to use safe methods and write_roles everything else"""
+
+    read_roles = ALL_ROLES
+    write_roles = ALL_ROLES
+    message = 'Your role does not allow this action.'
+
+    def has_permission(self, request, view):
+        if is_anonymous_allowed(request.user):
+            return True
+        roles = self.read_roles if request.method in SAFE_METHODS else self.write_roles
+        return user_role(request.user) in roles
+
+
+class IsActiveRole(RolePermission):
+    """Any active Administrator, Teacher or Super User"""
+
+
+class IsStaffOrReadOnly(RolePermission):
+    """Everyone with a role may read; only administrators and super users may write"""
+
+    write_roles = STAFF_ROLES
+
+
+class IsStaff(RolePermission):
+    """Administrators and super users only"""
+
+    read_roles = STAFF_ROLES
+    write_roles = STAFF_ROLES
+
+
+class IsSelfOrStaff(IsActiveRole):
+    """Users may act on their own Users row; staff may act on anyone's"""
+
+    def has_object_permission(self, request, view, obj):
+        if is_anonymous_allowed(request.user) or is_staff(request.user):
+            return True
+        linked = app_user(request.user)
+        return linked is not None and obj.pk == linked.pk
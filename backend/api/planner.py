@@ -0,0 +1,225 @@
+"""
+Observation slot planner for T-TESS Bloom observation groups
+"""
+from bisect import bisect_left
+from datetime import date, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .models.observation_groups import ObservationGroup
+from .models.schedule import Schedule
+
+
+def _to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _from_minutes(minutes: int) -> time:
+    return time(hour=minutes // 60, minute=minutes % 60)
+
+
+def generate_slots(
+    start_date: date,
+    end_date: date,
+    day_start: time,
+    day_end: time,
+    slot_minutes: int,
+    weekdays_only: bool = True
+) -> List[Tuple[date, int]]:
+    """
+    Build the ordered list of candidate (date, start minute) slots in the window
+    """
+    first = _to_minutes(day_start)
+    last = _to_minutes(day_end) - slot_minutes
+    slots = []
+    current = start_date
+    while current <= end_date:
+        if not weekdays_only or current.weekday() < 5:
+            slots.extend((current, minute) for minute in range(first, last + 1, slot_minutes))
+        current += timedelta(days=1)
+    return slots
+
+
+class BusyIndex:
+    """
+    Busy intervals per date, sorted by start, used to test a slot for overlap
+    with existing observations in O(log n) plus the intervals near the slot.
+    """
+
+    def __init__(self):
+        self._starts: Dict[date, List[int]] = {}
+        self._ends: Dict[date, List[int]] = {}
+        self._longest = 0
+
+    def add(self, day: date, minute: int, length: int):
+        starts = self._starts.setdefault(day, [])
+        ends = self._ends.setdefault(day, [])
+        index = bisect_left(starts, minute)
+        starts.insert(index, minute)
+        ends.insert(index, minute + length)
+        self._longest = max(self._longest, length)
+
+    def overlaps(self, day: date, minute: int, length: int) -> bool:
+        starts = self._starts.get(day)
+        if not starts:
+            return False
+        # Only intervals starting less than the longest one before the slot can reach into it
+        ends = self._ends[day]
+        index = bisect_left(starts, minute - self._longest + 1)
+        while index < len(starts) and starts[index] < minute + length:
+            if ends[index] > minute:
+                return True
+            index += 1
+        return False
+
+
+def plan_slots(
+    teacher_ids: Iterable[int],
+    slots: List[Tuple[date, int]],
+    slot_minutes: int,
+    observer_busy: Iterable[Tuple[date, int, int]] = (),
+    teacher_busy: Optional[Dict[int, Iterable[Tuple[date, int, int]]]] = None
+) -> Tuple[Dict[int, Tuple[date, int]], List[int]]:
+    """
+    Greedily assign each teacher the earliest free slot that conflicts with
+    neither the observer's nor the teacher's existing observations.
+
+    Args:
+        teacher_ids: Teachers to place, in priority order
+        slots: Candidate slots as returned by generate_slots
+        slot_minutes: Length of one observation
+        observer_busy: (date, start minute, length) of observations already booked for the observer
+        teacher_busy: Mapping of teacher id to its booked (date, start minute, length) observations
+
+    Returns:
+        Tuple of the assignment mapping and the list of teachers left unplaced
+    """
+    observer_index = BusyIndex()
+    for day, minute, length in observer_busy:
+        observer_index.add(day, minute, length)
+
+    teacher_indexes: Dict[int, BusyIndex] = {}
+    for teacher_id, busy in (teacher_busy or {}).items():
+        index = BusyIndex()
+        for day, minute, length in busy:
+            index.add(day, minute, length)
+        teacher_indexes[teacher_id] = index
+
+    # Slots clashing with the observer can never be used, so drop them up front
+    free = [slot for slot in slots if not observer_index.overlaps(*slot, slot_minutes)]
+    taken: Set[int] = set()
+    next_free = 0
+    assignments: Dict[int, Tuple[date, int]] = {}
+    unassigned: List[int] = []
+
+    for teacher_id in teacher_ids:
+        own = teacher_indexes.get(teacher_id)
+        position = next_free
+        while position < len(free) and (
+            position in taken or (own is not None and own.overlaps(*free[position], slot_minutes))
+        ):
+            position += 1
+
+        if position == len(free):
+            unassigned.append(teacher_id)
+            continue
+
+        assignments[teacher_id] = free[position]
+        taken.add(position)
+        while next_free in taken:
+            next_free += 1
+
+    return assignments, unassigned
+
+
+def plan_group_observations(
+    group: ObservationGroup,
+    start_date: date,
+    end_date: date,
+    day_start: time,
+    day_end: time,
+    slot_minutes: int = 30,
+    weekdays_only: bool = True
+) -> Dict:
+    """
+    Plan one observation per teacher in a group without touching the database
+
+    Existing scheduled observations in the window are treated as busy, for
+    their own length, both for the group's observer and for the individual
+    teachers. Teachers who already hold an observation in the group are left
+    out of the plan.
+    """
+    existing = Schedule.objects.exclude(status='Cancelled')
+    already_scheduled = set(
+        existing.filter(observation_group=group, teacher__isnull=False).values_list('teacher_id', flat=True)
+    )
+    teachers = list(group.teachers.select_related('user').order_by('id'))
+    teacher_ids = [teacher.id for teacher in teachers if teacher.id not in already_scheduled]
+
+    existing = existing.filter(date__gte=start_date, date__lte=end_date)
+
+    observer_busy = existing.filter(
+        observation_group__created_by_id=group.created_by_id,
+    ).values_list('date', 'time', 'duration_minutes')
+
+    teacher_busy: Dict[int, List[Tuple[date, int, int]]] = {}
+    busy_rows = existing.filter(teacher_id__in=teacher_ids).values_list('teacher_id', 'date', 'time', 'duration_minutes')
+    for teacher_id, day, start, length in busy_rows:
+        teacher_busy.setdefault(teacher_id, []).append((day, _to_minutes(start), length))
+
+    slots = generate_slots(start_date, end_date, day_start, day_end, slot_minutes, weekdays_only)
+    assignments, unassigned = plan_slots(
+        teacher_ids,
+        slots,
+        slot_minutes,
+        observer_busy=[(day, _to_minutes(start), length) for day, start, length in observer_busy],
+        teacher_busy=teacher_busy,
+    )
+
+    teachers_by_id = {teacher.id: teacher for teacher in teachers}
+    planned = []
+    for teacher_id in teacher_ids:
+        if teacher_id not in assignments:
+            continue
+        day, minute = assignments[teacher_id]
+        planned.append({
+            'teacher': teacher_id,
+            'teacher_name': teachers_by_id[teacher_id].user.name,
+            'user': teachers_by_id[teacher_id].user_id,
+            'date': day,
+            'time': _from_minutes(minute),
+        })
+
+    return {
+        'slots': planned,
+        'unassigned': [
+            {'teacher': teacher_id, 'teacher_name': teachers_by_id[teacher_id].user.name}
+            for teacher_id in unassigned
+        ],
+        'already_scheduled': [
+            {'teacher': teacher.id, 'teacher_name': teacher.user.name}
+            for teacher in teachers if teacher.id in already_scheduled
+        ],
+    }
+
+
+def commit_group_plan(
+    group: ObservationGroup,
+    planned: List[Dict],
+    slot_minutes: int = 30,
+    observation_type: str = 'formal',
+    notes: str = None
+) -> List[Schedule]:
+    """Persist planned slots as Schedule rows with a single bulk insert"""
+    schedules = [
+        Schedule(
+            observation_group=group,
+            teacher_id=slot['teacher'],
+            date=slot['date'],
+            time=slot['time'],
+            duration_minutes=slot_minutes,
+            observation_type=observation_type,
+            notes=notes,
+        )
+        for slot in planned
+    ]
+    return Schedule.objects.bulk_create(schedules)
@@ -1,11 +1,22 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from datetime import time
+from django.contrib.auth.models import User
 from .models.teachers import Teacher
 from .models.observation_groups import ObservationGroup
 from .models.schedule import Schedule
 from .models.administrators import Administrator
 from .models.user import Users
+from .models.lesson_plans import LessonPlan, LessonPlanUpload
+from .models.notifications import Notification
+from .models.schedule_archive import ArchivedSchedule
+from .uploads import max_upload_size
+from .transitions import SCHEDULE_TRANSITIONS
 
 class UserSerializer(serializers.ModelSerializer):
+    # Emails are unique across every school, not just the active tenant
+    email = serializers.EmailField(max_length=254, validators=[UniqueValidator(queryset=Users.all_tenants.all())])
+
     class Meta:
         model = Users
         fields = ['id', 'name', 'email', 'role', 'status', 'created_at', 'updated_at']
@@ -70,8 +81,8 @@ class ObservationGroupSerializer(serializers.ModelSerializer):
         return observation_group
 
     def update(self, instance, validated_data):
-        # Get teacher IDs from the request
-        teacher_ids = self.context['request'].data.get('teachers', [])
+        # Get teacher IDs from the request; absent on partial updates that leave members alone
+        teacher_ids = self.context['request'].data.get('teachers')
         
         # Update the observation group
         for attr, value in validated_data.items():
@@ -91,7 +102,7 @@ class ScheduleSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Schedule
-        fields = ['id', 'observation_group', 'teacher', 'date', 'time', 'observation_type', 'notes', 'status', 'created_at', 'updated_at']
+        fields = ['id', 'observation_group', 'teacher', 'date', 'time', 'duration_minutes', 'observation_type', 'notes', 'status', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def create(self, validated_data):
@@ -177,3 +188,117 @@ class AdministratorSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         return instance
+
+class ObservationPlanSerializer(serializers.Serializer):
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    day_start = serializers.TimeField(default=time(8, 0))
+    day_end = serializers.TimeField(default=time(15, 0))
+    slot_minutes = serializers.IntegerField(default=30, min_value=5, max_value=240)
+    weekdays_only = serializers.BooleanField(default=True)
+    observation_type = serializers.ChoiceField(choices=Schedule.OBSERVATION_TYPE_CHOICES, default='formal')
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    commit = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError("end_date must be on or after start_date")
+        if data['day_end'] <= data['day_start']:
+            raise serializers.ValidationError("day_end must be after day_start")
+        if (data['end_date'] - data['start_date']).days > 366:
+            raise serializers.ValidationError("Planning window cannot exceed one year")
+        return data
+
+class ArchivedScheduleSerializer(serializers.ModelSerializer):
+    teacher_name = serializers.CharField(source='teacher.user.name', read_only=True, default=None)
+    observation_group_name = serializers.CharField(source='observation_group.name', read_only=True, default=None)
+
+    class Meta:
+        model = ArchivedSchedule
+        fields = [
+            'id', 'observation_group', 'observation_group_name', 'teacher', 'teacher_name', 'date', 'time',
+            'observation_type', 'notes', 'status', 'created_at', 'updated_at', 'archived_at',
+        ]
+        read_only_fields = fields
+
+class ScheduleHistoryQuerySerializer(serializers.Serializer):
+    teacher = serializers.IntegerField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    status = serializers.MultipleChoiceField(choices=Schedule.STATUS_CHOICES, required=False)
+
+class LessonPlanSerializer(serializers.ModelSerializer):
+    teacher = TeacherSerializer(read_only=True)
+    file_sha256 = serializers.CharField(source='file.sha256', read_only=True, default=None)
+    file_size = serializers.IntegerField(source='file.size', read_only=True, default=None)
+
+    class Meta:
+        model = LessonPlan
+        fields = [
+            'id', 'teacher', 'title', 'subject', 'grade', 'date', 'objectives', 'materials',
+            'activities', 'assessment', 'notes', 'is_submitted', 'submitted_at',
+            'filename', 'file_sha256', 'file_size', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['id', 'filename', 'created_at', 'updated_at']
+
+    def create(self, validated_data):
+        teacher_id = self.context['request'].data.get('teacher')
+        try:
+            validated_data['teacher'] = Teacher.objects.get(id=teacher_id)
+        except (Teacher.DoesNotExist, ValueError, TypeError):
+            raise serializers.ValidationError(f"Teacher with id {teacher_id} does not exist")
+
+        return LessonPlan.objects.create(**validated_data)
+
+class LessonPlanUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LessonPlanUpload
+        fields = ['id', 'lesson_plan', 'filename', 'content_type', 'total_size', 'received_bytes', 'status', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'received_bytes', 'status', 'created_at', 'updated_at']
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("total_size must be positive")
+        if value > max_upload_size():
+            raise serializers.ValidationError(f"Uploads are limited to {max_upload_size()} bytes")
+        return value
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ['id', 'user', 'title', 'message', 'type', 'is_read', 'related_id', 'related_type', 'created_at']
+        read_only_fields = fields
+
+class NotificationPreferenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Users
+        fields = ['notification_delivery']
+
+class BulkUserEntrySerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    email = serializers.EmailField()
+    role = serializers.ChoiceField(choices=Users.ROLE_CHOICES)
+    status = serializers.ChoiceField(choices=Users.USER_STATUS_CHOICES, default='Active')
+
+class BulkUserImportSerializer(serializers.Serializer):
+    users = BulkUserEntrySerializer(many=True, allow_empty=False)
+
+    def validate_users(self, entries):
+        emails = [entry['email'] for entry in entries]
+        if len(set(emails)) != len(emails):
+            raise serializers.ValidationError("Emails must be unique within an import")
+        # One query per table rather than one per row
+        existing = set(Users.all_tenants.filter(email__in=emails).values_list('email', flat=True))
+        existing.update(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        if existing:
+            raise serializers.ValidationError(f"Users already exist: {', '.join(sorted(existing))}")
+        return entries
+
+class BulkScheduleStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=10000)
+    status = serializers.ChoiceField(choices=list(SCHEDULE_TRANSITIONS))
+
+class MarkNotificationsReadSerializer(serializers.Serializer):
+    # Staff only; defaults to the signed-in user
+    user = serializers.UUIDField(required=False)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_null=True)
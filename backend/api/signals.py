@@ -0,0 +1,121 @@
+"""
+Model signal handlers that publish live change events
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.utils import timezone
+from django.dispatch import receiver
+
+from . import events
+from .caching import bump_version
+from .models.administrators import Administrator
+from .models.observation_groups import ObservationGroup
+from .models.schedule import Schedule
+from .models.teachers import Teacher
+from .models.user import Users
+
+
+# Handlers return early when nobody is listening, so saves pay for audience
+# lookups only while live clients are connected.
+
+def _group_audience(group: ObservationGroup):
+    audience = list(group.teachers.values_list('user_id', flat=True))
+    audience.append(group.created_by_id)
+    return audience
+
+
+def _schedule_audience(schedule: Schedule):
+    audience = []
+    if schedule.teacher_id:
+        audience.append(schedule.teacher.user_id)
+    if schedule.observation_group_id:
+        audience.extend(_group_audience(schedule.observation_group))
+    return audience
+
+
+def _schedule_payload(schedule: Schedule):
+    return {
+        'id': schedule.id,
+        'teacher': schedule.teacher_id,
+        'observation_group': schedule.observation_group_id,
+        'date': schedule.date,
+        'time': schedule.time,
+        'status': schedule.status,
+    }
+
+
+def _group_payload(group: ObservationGroup):
+    return {
+        'id': group.id,
+        'name': group.name,
+        'status': group.status,
+    }
+
+
+def _publish_on_commit(event_type, payload, audience):
+    transaction.on_commit(lambda: events.publish(event_type, payload, audience))
+
+
+@receiver(post_save, sender=Schedule)
+def schedule_saved(sender, instance, created, **kwargs):
+    if not events.get_backend().has_subscribers():
+        return
+    event_type = 'schedule.created' if created else 'schedule.updated'
+    _publish_on_commit(event_type, _schedule_payload(instance), _schedule_audience(instance))
+
+
+@receiver(pre_delete, sender=Schedule)
+def schedule_deleted(sender, instance, **kwargs):
+    if not events.get_backend().has_subscribers():
+        return
+    # Audience is resolved before the row and its relations disappear
+    _publish_on_commit('schedule.deleted', {'id': instance.id}, _schedule_audience(instance))
+
+
+@receiver(post_save, sender=ObservationGroup)
+def group_saved(sender, instance, created, **kwargs):
+    if not events.get_backend().has_subscribers():
+        return
+    event_type = 'observation_group.created' if created else 'observation_group.updated'
+    _publish_on_commit(event_type, _group_payload(instance), _group_audience(instance))
+
+
+@receiver(pre_delete, sender=ObservationGroup)
+def group_deleted(sender, instance, **kwargs):
+    if not events.get_backend().has_subscribers():
+        return
+    _publish_on_commit('observation_group.deleted', {'id': instance.id}, _group_audience(instance))
+
+
+@receiver(m2m_changed, sender=ObservationGroup.teachers.through)
+def group_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Touch groups whose membership changed so their HTTP validators change too"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Teacher-side changes; post_clear carries no pk_set, so touch nothing we can't name
+        group_ids = pk_set or ()
+    else:
+        group_ids = [instance.pk]
+    if group_ids:
+        ObservationGroup.objects.filter(pk__in=group_ids).update(updated_at=timezone.now())
+
+
+# Models whose rows feed cached detail payloads; any write invalidates them
+VERSIONED_MODELS = (Users, Teacher, Administrator, ObservationGroup, Schedule)
+
+
+def model_changed(sender, **kwargs):
+    bump_version(sender)
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(model_changed, sender=model, dispatch_uid=f'bump_version_save_{model._meta.label_lower}')
+    post_delete.connect(model_changed, sender=model, dispatch_uid=f'bump_version_delete_{model._meta.label_lower}')
+
+
+@receiver(m2m_changed, sender=ObservationGroup.teachers.through)
+def group_membership_versions(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(ObservationGroup)
+        bump_version(Teacher)
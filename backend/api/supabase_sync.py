@@ -0,0 +1,218 @@
+"""
+Reconcile local Users with Supabase auth users and user_profiles
+
+Both sides are loaded in pages, compared by email as sets of
+(email, name, role) fingerprints, and only the differences are written back:
+missing auth users are created one request each under a concurrency limit,
+and profiles are upserted in batches.
+"""
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.lazy import lazy_import
+
+httpx = lazy_import('httpx')
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 8
+
+
+def supabase_role(role: str) -> str:
+    """Supabase role slug for a Users role, e.g. 'Super User' -> 'super_user'"""
+    return role.lower().replace(" ", "_")
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SupabaseAdmin:
+    """Async client for the Supabase admin auth API and the user_profiles table"""
+
+    def __init__(self, url: str, service_key: str, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = 30.0):
+        self.url = url.rstrip('/')
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            headers={
+                'Authorization': f'Bearer {service_key}',
+                'apikey': service_key,
+                'Content-Type': 'application/json',
+            },
+            limits=httpx.Limits(max_connections=concurrency),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs):
+        async with self.semaphore:
+            response = await self.client.request(method, f'{self.url}{path}', **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def list_auth_users(self, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, str]:
+        """Map of lowercased email to Supabase auth user id"""
+        users, page = {}, 1
+        while True:
+            response = await self._request('GET', '/auth/v1/admin/users', params={'page': page, 'per_page': page_size})
+            batch = response.json().get('users', [])
+            for user in batch:
+                if user.get('email'):
+                    users[user['email'].lower()] = user['id']
+            if len(batch) < page_size:
+                return users
+            page += 1
+
+    async def list_profiles(self, page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict]:
+        profiles, offset = [], 0
+        while True:
+            response = await self._request('GET', '/rest/v1/user_profiles', params={
+                'select': 'id,email,fullName,role',
+                'order': 'id',
+                'limit': page_size,
+                'offset': offset,
+            })
+            batch = response.json()
+            profiles.extend(batch)
+            if len(batch) < page_size:
+                return profiles
+            offset += page_size
+
+    async def create_auth_user(self, email: str, name: str, role: str, password: Optional[str] = None) -> str:
+        # Without a password the user sets one through Supabase's recovery flow
+        payload = {
+            'email': email,
+            'email_confirm': True,
+            'user_metadata': {'name': name, 'role': role},
+        }
+        if password:
+            payload['password'] = password
+        response = await self._request('POST', '/auth/v1/admin/users', json=payload)
+        return response.json()['id']
+
+    async def upsert_profiles(self, profiles: List[Dict]):
+        await self._request(
+            'POST', '/rest/v1/user_profiles',
+            json=profiles,
+            headers={'Prefer': 'resolution=merge-duplicates,return=minimal'},
+        )
+
+
+async def provision(
+    admin: SupabaseAdmin,
+    accounts: Iterable[Tuple[str, str, str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict:
+    """
+    Create Supabase auth users with known passwords, and their profiles, for new local accounts
+
+    Args:
+        admin: Client for the Supabase project
+        accounts: (email, name, role, password) rows
+        batch_size: Profiles per upsert request
+
+    Returns:
+        Emails of the accounts that can now sign in, and (email, error) failures
+    """
+    accounts = list(accounts)
+    report = {'created': [], 'failed': []}
+    auth_users = {}
+
+    async def create(email, name, role, password):
+        try:
+            auth_users[email] = await admin.create_auth_user(email, name, role, password)
+        except httpx.HTTPError as e:
+            report['failed'].append((email, str(e)))
+
+    await asyncio.gather(*(create(*account) for account in accounts))
+
+    rows = [
+        {'id': auth_users[email], 'email': email, 'fullName': name, 'role': supabase_role(role)}
+        for email, name, role, _ in accounts if email in auth_users
+    ]
+
+    async def upsert(batch):
+        try:
+            await admin.upsert_profiles(batch)
+            report['created'].extend(row['email'] for row in batch)
+        except httpx.HTTPError as e:
+            report['failed'].extend((row['email'], str(e)) for row in batch)
+
+    await asyncio.gather(*(upsert(batch) for batch in _chunks(rows, batch_size)))
+    return report
+
+
+async def reconcile(
+    admin: SupabaseAdmin,
+    local_users: Iterable[Tuple[str, str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    dry_run: bool = False,
+) -> Dict:
+    """
+    Bring Supabase in line with local Users
+
+    Args:
+        admin: Client for the Supabase project
+        local_users: (email, name, role) rows from Users
+        batch_size: Profiles per upsert request
+        page_size: Rows per page when listing Supabase users and profiles
+        dry_run: Only report what would change
+
+    Returns:
+        Counts of created auth users, upserted profiles, failures and
+        Supabase-only emails, which are reported but never deleted
+    """
+    local = {email.lower(): (name, role) for email, name, role in local_users}
+    auth_users, profiles = await asyncio.gather(admin.list_auth_users(page_size), admin.list_profiles(page_size))
+
+    local_fingerprints = {(email, name, supabase_role(role)) for email, (name, role) in local.items()}
+    remote_fingerprints = {
+        (profile['email'].lower(), profile.get('fullName'), profile.get('role'))
+        for profile in profiles if profile.get('email')
+    }
+    stale = {email for email, _, _ in local_fingerprints - remote_fingerprints}
+    missing_auth = sorted(set(local) - set(auth_users))
+
+    report = {
+        'local': len(local),
+        'remote': len(auth_users),
+        'auth_created': 0,
+        'profiles_upserted': 0,
+        'failed': [],
+        'remote_only': len(set(auth_users) - set(local)),
+    }
+    if dry_run:
+        report.update(auth_created=len(missing_auth), profiles_upserted=len(stale))
+        return report
+
+    async def create(email):
+        name, role = local[email]
+        try:
+            auth_users[email] = await admin.create_auth_user(email, name, role)
+            report['auth_created'] += 1
+        except httpx.HTTPError as e:
+            report['failed'].append((email, str(e)))
+
+    await asyncio.gather(*(create(email) for email in missing_auth))
+
+    rows = [
+        {'id': auth_users[email], 'email': email, 'fullName': local[email][0], 'role': supabase_role(local[email][1])}
+        for email in sorted(stale) if email in auth_users
+    ]
+
+    async def upsert(batch):
+        try:
+            await admin.upsert_profiles(batch)
+            report['profiles_upserted'] += len(batch)
+        except httpx.HTTPError as e:
+            report['failed'].extend((row['email'], str(e)) for row in batch)
+
+    await asyncio.gather(*(upsert(batch) for batch in _chunks(rows, batch_size)))
+    return report
@@ -0,0 +1,131 @@
+"""
+Per-school tenancy
+
+Users, Teacher and ObservationGroup rows carry a tenant. The tenant of a
+request comes from the authenticated user's Users row; staff who are not
+bound to one may pick a school with the X-Tenant header (a Tenant slug).
+While a tenant is active, the default managers of tenant-owned models only
+see its rows, TenantScopedMixin viewsets filter their querysets to it, and
+cache keys are namespaced by it.
+
+Requests that resolve no tenant keep the old single-school behaviour:
+nothing is filtered. Rows from before tenancy were assigned a tenant by
+migration 0010; rows created without one since are unassigned and only
+reach unscoped requests until they are given a tenant.
+"""
+import contextvars
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Q
+
+TENANT_HEADER = 'HTTP_X_TENANT'
+# Slug lookups are cached; a missing slug is cached as '' so it is not re-queried
+SLUG_CACHE_TTL = 300
+
+_current_tenant = contextvars.ContextVar('current_tenant', default=None)
+
+
+def current_tenant_id():
+    return _current_tenant.get()
+
+
+@contextmanager
+def tenant_context(tenant_id):
+    """Activate a tenant (or None for all tenants) for the duration of the block"""
+    token = _current_tenant.set(tenant_id)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+def tenant_cache_namespace() -> str:
+    """Prefix for cache keys whose payload depends on the active tenant"""
+    tenant_id = current_tenant_id()
+    return f'tenant:{tenant_id}' if tenant_id else 'tenant:all'
+
+
+class TenantManager(models.Manager):
+    """Default manager that only returns the active tenant's rows"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tenant_id = current_tenant_id()
+        return queryset.filter(tenant_id=tenant_id) if tenant_id else queryset
+
+
+def tenant_for_slug(slug: str):
+    from .models.tenants import Tenant
+
+    key = f'tenant-slug:{slug}'
+    tenant_id = cache.get(key)
+    if tenant_id is None:
+        tenant_id = Tenant.objects.filter(slug=slug).values_list('id', flat=True).first() or ''
+        cache.set(key, tenant_id, SLUG_CACHE_TTL)
+    return tenant_id or None
+
+
+def resolve_tenant(request):
+    """
+    Tenant id a request is scoped to
+
+    A user bound to a tenant is always scoped to it, whatever the header says;
+    the header is only honoured for unbound staff.
+
+    Returns:
+        The tenant id, or None to leave the request unscoped
+    """
+    from .permissions import app_user, is_staff
+
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    linked = app_user(user)
+    if linked is not None and linked.tenant_id:
+        return linked.tenant_id
+    slug = request.META.get(TENANT_HEADER)
+    return tenant_for_slug(slug) if slug and is_staff(user) else None
+
+
+class TenantScopedMixin:
+    """
+    Filters a viewset's queryset to the request's tenant and stamps it on new rows
+
+    tenant_lookups names the paths from the model to a tenant; rows match if
+    any of them does, e.g. ('teacher__tenant', 'observation_group__tenant')
+    for schedules that belong to either a teacher or a group.
+    """
+    tenant_lookups: Sequence[str] = ('tenant',)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.tenant_id = resolve_tenant(request)
+        self._tenant_token = _current_tenant.set(self.tenant_id)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_tenant_token', None)
+        if token is not None:
+            _current_tenant.reset(token)
+            self._tenant_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tenant_id = getattr(self, 'tenant_id', None)
+        if not tenant_id:
+            return queryset
+        match = Q()
+        for lookup in self.tenant_lookups:
+            match |= Q(**{lookup: tenant_id})
+        return queryset.filter(match)
+
+    def tenant_save_kwargs(self) -> dict:
+        """Extra save() kwargs for rows created through this viewset"""
+        tenant_id = getattr(self, 'tenant_id', None)
+        return {'tenant_id': tenant_id} if tenant_id and self.tenant_lookups == ('tenant',) else {}
+
+    def perform_create(self, serializer):
+        serializer.save(**self.tenant_save_kwargs())
@@ -0,0 +1,83 @@
+"""
+Bulk status transitions for schedules and observation groups
+
+A transition locks the eligible rows, moves them with a single
+UPDATE ... WHERE id IN (...), and queues the resulting inbox notifications
+and live events once for the whole batch instead of once per row.
+"""
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import events
+from .caching import bump_version
+from .inbox import notify_status_changed
+from .models.observation_groups import ObservationGroup
+from .models.schedule import Schedule
+
+# Target status -> statuses a schedule may move from
+SCHEDULE_TRANSITIONS = {
+    'Completed': ('Scheduled',),
+    'Cancelled': ('Scheduled',),
+    'Scheduled': ('Cancelled',),
+}
+
+
+def transition(queryset, status: str) -> List:
+    """
+    Move every schedule in queryset that may reach status, with one UPDATE
+
+    Returns:
+        Ids of the schedules that moved
+    """
+    if status not in SCHEDULE_TRANSITIONS:
+        raise ValueError(f'Unknown schedule status: {status}')
+
+    with transaction.atomic():
+        eligible = queryset.order_by().filter(status__in=SCHEDULE_TRANSITIONS[status])
+        # Locks the rows, so concurrent transitions cannot both claim them
+        updated = list(eligible.select_for_update(of=('self',)).values_list('id', flat=True))
+        if updated:
+            # update() skips auto_now, so bump updated_at for conditional GET validators
+            Schedule.objects.filter(id__in=updated).update(status=status, updated_at=timezone.now())
+            _after_update(updated, status)
+    return updated
+
+
+def bulk_set_status(schedule_ids: Iterable, status: str, queryset=None) -> Dict:
+    """
+    Move many schedules to a new status in one UPDATE
+
+    Args:
+        schedule_ids: Schedules to move
+        status: Target status, a key of SCHEDULE_TRANSITIONS
+        queryset: Schedules the caller may touch; defaults to all of them
+
+    Returns:
+        'updated' ids that moved, and 'skipped' ids that were missing, out of
+        reach of queryset, or not in a status that can move to the target
+    """
+    requested = list(dict.fromkeys(schedule_ids))
+    queryset = queryset if queryset is not None else Schedule.objects.all()
+    updated = transition(queryset.filter(id__in=requested), status)
+    moved = set(updated)
+    return {'updated': updated, 'skipped': [pk for pk in requested if pk not in moved]}
+
+
+def _after_update(schedule_ids: List, status: str):
+    schedules = list(Schedule.objects.filter(id__in=schedule_ids).select_related('observation_group'))
+    notifications = notify_status_changed(schedules, status)
+    audience = {notification.user_id for notification in notifications}
+    # update() skips the signals that invalidate caches and publish events
+    transaction.on_commit(lambda: bump_version(Schedule))
+    transaction.on_commit(lambda: events.publish(
+        'schedule.bulk_updated',
+        {'ids': schedule_ids, 'status': status},
+        audience=list(audience),
+    ))
+
+
+def cancel_group_schedules(group: ObservationGroup) -> List:
+    """Cancel every still-scheduled observation of a group; returns the cancelled ids"""
+    return transition(Schedule.objects.filter(observation_group=group), 'Cancelled')
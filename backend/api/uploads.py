@@ -0,0 +1,213 @@
+"""
+Chunked, resumable lesson plan uploads and ranged downloads
+"""
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date
+
+from .models.lesson_plans import LessonPlanFile, LessonPlanUpload
+
+# Bytes read from the request or file per iteration; bounds memory per request
+BLOCK_SIZE = 64 * 1024
+DEFAULT_MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Running SHA-256 state per in-progress upload, keyed by upload id and valid
+# for the recorded offset. A process that does not hold the state (restart,
+# another worker) rebuilds it by streaming the partial file once.
+_hashers: Dict[str, Tuple[int, 'hashlib._Hash']] = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def max_upload_size() -> int:
+    return getattr(settings, 'LESSON_PLAN_MAX_UPLOAD_SIZE', DEFAULT_MAX_UPLOAD_SIZE)
+
+
+def partial_path(upload: LessonPlanUpload) -> str:
+    return os.path.join(settings.MEDIA_ROOT, 'uploads', f'{upload.id}.part')
+
+
+def _hash_file(path: str, hasher=None):
+    hasher = hasher or hashlib.sha256()
+    if os.path.exists(path):
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(BLOCK_SIZE), b''):
+                hasher.update(block)
+    return hasher
+
+
+def _get_hasher(upload: LessonPlanUpload):
+    key = str(upload.id)
+    with _hashers_lock:
+        state = _hashers.pop(key, None)
+    if state and state[0] == upload.received_bytes:
+        return state[1]
+    return _hash_file(partial_path(upload))
+
+
+def append_chunk(upload: LessonPlanUpload, stream, offset: int) -> LessonPlanUpload:
+    """
+    Append one chunk from a file-like request stream to the partial upload
+
+    The chunk is copied to disk block by block while the running digest is
+    updated, so neither the chunk nor the file is ever held in memory. The
+    upload row stays locked until the chunk is recorded, so concurrent chunks
+    for the same upload are applied one after the other.
+
+    Raises:
+        UploadError: If the offset does not match the bytes already received or
+            the chunk would exceed the declared size
+    """
+    with transaction.atomic():
+        locked = LessonPlanUpload.objects.select_for_update().get(pk=upload.pk)
+        upload.received_bytes, upload.status = locked.received_bytes, locked.status
+
+        if upload.status == 'Complete':
+            raise UploadError('Upload is already complete', status_code=409)
+        if offset != upload.received_bytes:
+            raise UploadError(f'Expected offset {upload.received_bytes}', status_code=409)
+
+        path = partial_path(upload)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        hasher = _get_hasher(upload)
+
+        written = 0
+        with open(path, 'ab') as handle:
+            # Drop anything past the last acknowledged byte left by an interrupted chunk
+            handle.truncate(upload.received_bytes)
+            for block in iter(lambda: stream.read(BLOCK_SIZE), b''):
+                written += len(block)
+                if upload.received_bytes + written > upload.total_size:
+                    handle.truncate(upload.received_bytes)
+                    raise UploadError('Chunk exceeds the declared upload size', status_code=413)
+                handle.write(block)
+                hasher.update(block)
+
+        upload.received_bytes += written
+        upload.save(update_fields=['received_bytes', 'updated_at'])
+
+        if upload.received_bytes == upload.total_size:
+            finalize_upload(upload, hasher.hexdigest())
+        else:
+            with _hashers_lock:
+                _hashers[str(upload.id)] = (upload.received_bytes, hasher)
+    return upload
+
+
+def finalize_upload(upload: LessonPlanUpload, digest: str) -> LessonPlanFile:
+    """Move a finished upload into content-addressed storage and attach it to its lesson plan"""
+    path = partial_path(upload)
+    stored = LessonPlanFile.objects.filter(sha256=digest).first()
+
+    if stored is None:
+        name = os.path.join('lesson_plans', digest[:2], digest)
+        target = os.path.join(settings.MEDIA_ROOT, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        try:
+            with transaction.atomic():
+                stored = LessonPlanFile.objects.create(
+                    sha256=digest,
+                    file=name,
+                    size=upload.total_size,
+                    content_type=upload.content_type,
+                )
+        except IntegrityError:
+            # A concurrent upload of the same content won; its file is identical
+            stored = LessonPlanFile.objects.get(sha256=digest)
+    elif os.path.exists(path):
+        os.remove(path)
+
+    lesson_plan = upload.lesson_plan
+    lesson_plan.file = stored
+    lesson_plan.filename = upload.filename
+    lesson_plan.save(update_fields=['file', 'filename', 'updated_at'])
+
+    upload.status = 'Complete'
+    upload.save(update_fields=['status', 'updated_at'])
+    return stored
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range: bytes=`` header into inclusive (start, end)
+
+    Returns None when no usable range was requested.
+
+    Raises:
+        UploadError: If the range cannot be satisfied
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise UploadError('Requested range not satisfiable', status_code=416)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise UploadError('Requested range not satisfiable', status_code=416)
+    return start, end
+
+
+def _read_range(path: str, start: int, end: int):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = handle.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def ranged_file_response(request, stored: LessonPlanFile, filename: str) -> HttpResponse:
+    """Stream a stored file, honouring a single byte range request"""
+    path = stored.file.path
+    size = stored.size
+
+    try:
+        requested = parse_range(request.headers.get('Range'), size)
+    except UploadError as e:
+        response = HttpResponse(str(e), status=e.status_code)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = requested or (0, size - 1)
+    response = StreamingHttpResponse(
+        _read_range(path, start, end) if size else iter(()),
+        status=206 if requested else 200,
+        content_type=stored.content_type,
+    )
+    response['Content-Length'] = str(end - start + 1 if size else 0)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = f'"{stored.sha256}"'
+    response['Last-Modified'] = http_date(stored.created_at.timestamp())
+    # Quotes and escapes plain names, RFC 5987-encodes the rest
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    if requested:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -8,10 +8,15 @@ router.register(r'teachers', TeacherViewSet)
 router.register(r'observation-groups', ObservationGroupViewSet)
 router.register(r'schedules', ScheduleViewSet)
 router.register(r'administrators', AdministratorViewSet)
+router.register(r'lesson-plans', LessonPlanViewSet)
+router.register(r'lesson-plan-uploads', LessonPlanUploadViewSet)
+router.register(r'notifications', NotificationViewSet)
+router.register(r'schedule-archive', ArchivedScheduleViewSet)
 
 urlpatterns = [
     # path('', index, name='index'),
     path('total-stats/', TotalStats, name='total-stats'),
     path('auth/login/', django_auth_login, name='django-auth-login'),
+    path('events/', event_stream, name='event-stream'),
     path('', include(router.urls)),
 ]
@@ -1,26 +1,48 @@
-from django.core.mail import send_mail
+from django.core.mail import get_connection, send_mail
 from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
 from .models.user import Users
+from .hashing import hash_passwords
+from .caching import bump_version
+from .supabase_sync import SupabaseAdmin, provision, supabase_role
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import logging
 import random
 import string
-import httpx
+from backend.lazy import lazy_import
 
-def send_email(user: Users, password: str):
-    subject = 'Welcome to TET Bloom - Your Account is Ready'
-    login_url = f"{settings.SITE_URL}/login"
-    message = f"""
-    Hello {user.name},
+# Only needed when provisioning Supabase users
+httpx = lazy_import('httpx')
 
-    Welcome to TET Bloom! Your account has been created successfully.
+logger = logging.getLogger(__name__)
+
+# Welcome emails carry passwords, so they are handed to a thread rather than
+# stored in a queue table; one thread keeps a single SMTP connection busy
+_welcome_mail = ThreadPoolExecutor(max_workers=1, thread_name_prefix='welcome-mail')
 
-    Login Details:
+def send_email(user: Users, password: str = None, connection=None):
+    subject = 'Welcome to TET Bloom - Your Account is Ready'
+    login_url = f"{settings.SITE_URL}/login"
+    if password:
+        details = f"""Login Details:
     Email: {user.email}
     Temporary Password: {password}
 
     Please click the link below to access the system and change your password:
     {login_url}
 
-    Important: Please log in and change your password immediately for security.
+    Important: Please log in and change your password immediately for security."""
+    else:
+        details = f"""Please click the link below to choose your password and access the system:
+    {generate_reset_link(user.email)}"""
+    message = f"""
+    Hello {user.name},
+
+    Welcome to TET Bloom! Your account has been created successfully.
+
+    {details}
 
     If you have any questions, please contact your administrator.
 
@@ -33,21 +55,128 @@ def send_email(user: Users, password: str):
         settings.DEFAULT_FROM_EMAIL,
         [user.email],
         fail_silently=False,
+        connection=connection,
     )
 
 
+def _send_welcome_emails(accounts):
+    try:
+        # Off the request thread, so waiting for the sending quota is fine
+        with get_connection(max_wait=None) as connection:
+            for user, password in accounts:
+                try:
+                    send_email(user, password, connection=connection)
+                except Exception as e:
+                    logger.warning(f"Failed to send welcome email to {user.email}: {e}")
+    except Exception as e:
+        logger.error(f"Failed to send {len(accounts)} welcome emails: {e}")
+
+
+def queue_welcome_emails(accounts, provisioned) -> Future:
+    """
+    Send welcome emails for new accounts from a background thread
+
+    Args:
+        accounts: (Users, raw_password) pairs from create_accounts
+        provisioned: Emails whose Supabase login uses that password; the
+            others are sent a link to choose a password instead
+
+    Returns:
+        Future that completes once every email was attempted
+    """
+    return _welcome_mail.submit(_send_welcome_emails, [
+        (user, password if user.email in provisioned else None) for user, password in accounts
+    ])
+
+
 def generate_password(length=12):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
 
 
+def _unique_usernames(emails):
+    """Email as username, suffixed like UserViewSet.create when the name is taken"""
+    taken = set(User.objects.filter(username__in=emails).values_list('username', flat=True))
+    usernames = []
+    for email in emails:
+        username = email
+        if username in taken:
+            taken.update(User.objects.filter(username__startswith=f"{email}_").values_list('username', flat=True))
+            counter = 1
+            while f"{email}_{counter}" in taken:
+                counter += 1
+            username = f"{email}_{counter}"
+        taken.add(username)
+        usernames.append(username)
+    return usernames
+
+
+def create_accounts(entries, workers=None, tenant_id=None):
+    """
+    Create Users rows and inactive Django auth users for many accounts at once
+
+    Passwords are generated here and hashed across worker processes; both
+    tables are written with one bulk insert each.
+
+    Args:
+        entries: Validated dicts with name, email, role and optionally status
+        workers: Size of a dedicated hashing pool; defaults to the shared one
+        tenant_id: School the accounts belong to, if any
+
+    Returns:
+        List of (Users, raw_password) pairs in input order
+    """
+    passwords = [generate_password() for _ in entries]
+    hashes = hash_passwords(passwords, workers)
+    emails = [entry['email'] for entry in entries]
+
+    with transaction.atomic():
+        users = Users.objects.bulk_create([
+            Users(name=entry['name'], email=entry['email'], role=entry['role'], status=entry.get('status', 'Active'), tenant_id=tenant_id)
+            for entry in entries
+        ])
+        User.objects.bulk_create([
+            User(username=username, email=email, password=encoded, is_active=False)
+            for username, email, encoded in zip(_unique_usernames(emails), emails, hashes)
+        ])
+        # bulk_create skips the signals that invalidate cached Users payloads
+        transaction.on_commit(lambda: bump_version(Users))
+
+    return list(zip(users, passwords))
+
+
+def provision_supabase_accounts(accounts):
+    """
+    Create Supabase logins, with their generated passwords, for accounts from create_accounts
+
+    Returns:
+        Emails of the accounts that can sign in; empty when Supabase is not configured
+    """
+    if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_ROLE_KEY:
+        logger.warning("Supabase is not configured; new accounts will be asked to choose a password")
+        return set()
+
+    async def run():
+        async with SupabaseAdmin(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY) as admin:
+            return await provision(admin, [(user.email, user.name, user.role, password) for user, password in accounts])
+
+    report = asyncio.run(run())
+    for email, error in report['failed']:
+        logger.warning(f"Failed to create Supabase user {email}: {error}")
+    return set(report['created'])
+
+
 def create_supabase_user(email: str, password: str, name: str, role: str):
     """Create user in Supabase using admin API"""
     try:
-        # Use the same Supabase URL from your frontend
-        supabase_url = "https://csgdjckpnonkwwctugtj.supabase.co"
+        # Same project as the frontend; see SUPABASE_URL in settings
+        supabase_url = settings.SUPABASE_URL.rstrip('/')
         # Get service role key from environment or settings
         supabase_service_key = settings.SUPABASE_SERVICE_ROLE_KEY
         
+        if not supabase_url:
+            print("⚠️  SUPABASE_URL not configured - new users won't be able to login via frontend")
+            return False
+        
         # For testing: If no service key, just skip Supabase creation (user won't be able to login)
         if not supabase_service_key:
             print("⚠️  SUPABASE_SERVICE_ROLE_KEY not configured - new users won't be able to login via frontend")
@@ -91,7 +220,7 @@ def create_supabase_user(email: str, password: str, name: str, role: str):
                 "id": user_id,
                 "email": email,
                 "fullName": name,
-                "role": role.lower().replace(" ", "_")  # Convert "Super User" to "super_user"
+                "role": supabase_role(role)  # Convert "Super User" to "super_user"
             }
             
             profile_response = client.post(profile_url, json=profile_data, headers=profile_headers)
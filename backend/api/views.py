@@ -1,7 +1,7 @@
 from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
-from rest_framework import viewsets, filters
-from rest_framework.decorators import api_view
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework import viewsets, filters, mixins
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import authenticate
 from django.db.models import Count
@@ -10,14 +10,39 @@ from .models.teachers import Teacher
 from .models.observation_groups import ObservationGroup
 from .models.schedule import Schedule
 from .models.administrators import Administrator
-from .serializers import UserSerializer, TeacherSerializer, ObservationGroupSerializer, ScheduleSerializer, AdministratorSerializer
-from .utils import send_email, generate_password, create_supabase_user
+from .models.lesson_plans import LessonPlan, LessonPlanUpload
+from .serializers import UserSerializer, TeacherSerializer, ObservationGroupSerializer, ScheduleSerializer, AdministratorSerializer, ObservationPlanSerializer
+from .serializers import LessonPlanSerializer, LessonPlanUploadSerializer, NotificationSerializer, MarkNotificationsReadSerializer
+from .serializers import BulkUserImportSerializer, ArchivedScheduleSerializer, ScheduleHistoryQuerySerializer, BulkScheduleStatusSerializer
+from .serializers import NotificationPreferenceSerializer
+from .models.notifications import Notification
+from .models.schedule_archive import ArchivedSchedule
+from .archive import schedule_history
+from .utils import send_email, generate_password, create_supabase_user, create_accounts, provision_supabase_accounts, queue_welcome_emails
 from .notifications import NotificationService
+from .planner import plan_group_observations, commit_group_plan
+from .events import publish as publish_event, stream_events
+from .inbox import notify_schedules_created, unread_count, mark_read
+from .transitions import bulk_set_status, cancel_group_schedules
+from .digest import deliver_observation_scheduled, notify_planned_schedules, scheduled_email_data
+from .uploads import UploadError, append_chunk, ranged_file_response
+from .caching import ConditionalGetMixin, CachedRetrieveMixin
+from .tenancy import TenantScopedMixin, resolve_tenant, tenant_context
+from .idempotency import IdempotencyMixin
+from .permissions import IsActiveRole, IsSelfOrStaff, IsStaff, IsStaffOrReadOnly, app_user, is_anonymous_allowed, is_staff, user_role
+from auths.authentication import CachedJWTAuthentication
+from asgiref.sync import sync_to_async
+from .fast_lists import FastListMixin, teacher_list, schedule_list
+from .exports import ExportMixin, USER_EXPORT_FIELDS, TEACHER_EXPORT_FIELDS, SCHEDULE_EXPORT_FIELDS
 from rest_framework import status
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.db import transaction
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied, ValidationError
+import io
 import logging
 
 logger = logging.getLogger(__name__)
@@ -90,21 +115,30 @@ def django_auth_login(request):
         return Response({'error': 'Authentication failed'}, status=500)
 
 @api_view(['GET'])
+@permission_classes([IsActiveRole])
 def TotalStats(request):
     try:
-        stats = {
-            'total_users': Users.objects.count(),
-            'total_teachers': Teacher.objects.count(),
-            'total_administrators': Administrator.objects.count(),
-            'total_observation_groups': ObservationGroup.objects.count(),
-        }
+        tenant_id = resolve_tenant(request)
+        administrators = Administrator.objects.filter(user__tenant_id=tenant_id) if tenant_id else Administrator.objects
+        # The default managers count only the active tenant's rows
+        with tenant_context(tenant_id):
+            stats = {
+                'total_users': Users.objects.count(),
+                'total_teachers': Teacher.objects.count(),
+                'total_administrators': administrators.count(),
+                'total_observation_groups': ObservationGroup.objects.count(),
+            }
         return Response(stats)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(IdempotencyMixin, TenantScopedMixin, ConditionalGetMixin, CachedRetrieveMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Users.objects.all()
     serializer_class = UserSerializer
+    permission_classes = [IsStaffOrReadOnly]
+    cache_dependencies = (Users,)
+    export_fields = USER_EXPORT_FIELDS
+    export_filename = 'users'
     filter_backends = [filters.SearchFilter]
     search_fields = [
         'name',
@@ -119,7 +153,8 @@ class UserViewSet(viewsets.ModelViewSet):
             try:
                 # Check if user already exists
                 email = request.data.get('email')
-                if Users.objects.filter(email=email).exists():
+                # Emails are unique across every school
+                if Users.all_tenants.filter(email=email).exists():
                     return Response(
                         {'error': f'User with email {email} already exists'}, 
                         status=status.HTTP_400_BAD_REQUEST
@@ -136,7 +171,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 serializer.is_valid(raise_exception=True)
                 
                 # Create the Users record first
-                users_instance = serializer.save()
+                users_instance = serializer.save(**self.tenant_save_kwargs())
                 
                 # Generate password and create Django User
                 raw_password = generate_password()
@@ -176,9 +211,42 @@ class UserViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
 
-class TeacherViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get', 'patch'], url_path='notification-preferences', permission_classes=[IsSelfOrStaff])
+    def notification_preferences(self, request, pk=None):
+        """Read or change whether a user's emails arrive immediately or as a daily digest"""
+        serializer = NotificationPreferenceSerializer(self.get_object(), data=request.data, partial=True)
+        if request.method == 'PATCH':
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(NotificationPreferenceSerializer(serializer.instance).data)
+
+    @action(detail=False, methods=['post'], url_path='bulk-import', permission_classes=[IsStaff])
+    def bulk_import(self, request):
+        """Create many accounts in one request, hashing their passwords on every core"""
+        params = BulkUserImportSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        accounts = create_accounts(params.validated_data['users'], tenant_id=self.tenant_id)
+        # Only accounts with a working Supabase login are emailed their password
+        provisioned = provision_supabase_accounts(accounts)
+        queue_welcome_emails(accounts, provisioned)
+
+        return Response({
+            'created': len(accounts),
+            'users': UserSerializer([users_instance for users_instance, _ in accounts], many=True).data,
+            'provisioned': len(provisioned),
+            'emails_queued': len(accounts),
+        }, status=status.HTTP_201_CREATED)
+
+class TeacherViewSet(TenantScopedMixin, ConditionalGetMixin, CachedRetrieveMixin, FastListMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Teacher.objects.select_related('user').all()
     serializer_class = TeacherSerializer
+    permission_classes = [IsStaffOrReadOnly]
+    validator_fields = ('updated_at', 'user__updated_at')
+    cache_dependencies = (Teacher, Users)
+    fast_list = staticmethod(teacher_list)
+    export_fields = TEACHER_EXPORT_FIELDS
+    export_filename = 'teachers'
     
     def create(self, request, *args, **kwargs):
         print("TeacherViewSet create called with data:", request.data)
@@ -188,17 +256,115 @@ class TeacherViewSet(viewsets.ModelViewSet):
             print("Error creating teacher:", str(e))
             raise
 
-class ObservationGroupViewSet(viewsets.ModelViewSet):
+class ObservationGroupViewSet(TenantScopedMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = ObservationGroup.objects.all()
     serializer_class = ObservationGroupSerializer
+    permission_classes = [IsStaffOrReadOnly]
+    validator_fields = ('updated_at', 'created_by__updated_at', 'teachers__updated_at', 'teachers__user__updated_at')
+
+    def perform_update(self, serializer):
+        previous = serializer.instance.status
+        with transaction.atomic():
+            group = serializer.save()
+            # Cancelling a group cancels its pending observations in one UPDATE
+            if group.status == 'Cancelled' and previous != 'Cancelled':
+                cancel_group_schedules(group)
+
+    @action(detail=True, methods=['post'])
+    def plan(self, request, pk=None):
+        """Preview, and optionally commit, one observation slot per teacher in the group"""
+        group = self.get_object()
+        params = ObservationPlanSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        options = params.validated_data
+
+        def plan_now():
+            return plan_group_observations(
+                group,
+                start_date=options['start_date'],
+                end_date=options['end_date'],
+                day_start=options['day_start'],
+                day_end=options['day_end'],
+                slot_minutes=options['slot_minutes'],
+                weekdays_only=options['weekdays_only'],
+            )
+
+        if not options['commit']:
+            plan = plan_now()
+            return Response({'committed': False, 'created': 0, **plan}, status=status.HTTP_200_OK)
+
+        with transaction.atomic():
+            # Concurrent commits for the same group queue here, so the second
+            # sees the first one's slots and skips those teachers
+            ObservationGroup.all_tenants.select_for_update().filter(pk=group.pk).first()
+            plan = plan_now()
+            schedules = commit_group_plan(
+                group,
+                plan['slots'],
+                slot_minutes=options['slot_minutes'],
+                observation_type=options['observation_type'],
+                notes=options.get('notes'),
+            ) if plan['slots'] else []
+            if schedules:
+                notify_schedules_created(schedules)
+                # bulk_create skips model signals, so announce the plan as one event
+                transaction.on_commit(lambda: publish_event(
+                    'observation_group.planned',
+                    {'id': group.id, 'created': len(schedules)},
+                    audience=[group.created_by_id, *(slot['user'] for slot in plan['slots'])],
+                ))
+                # Emails go out once the slots are committed, as for a single schedule
+                transaction.on_commit(lambda: self._notify_planned(group, schedules))
+
+        created = len(schedules)
+        return Response({
+            'committed': bool(created),
+            'created': created,
+            **plan,
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def _notify_planned(self, group, schedules):
+        try:
+            notify_planned_schedules(group, schedules)
+        except Exception as e:
+            # Log error but don't fail the committed plan
+            logger.error(f"Failed to send notifications for the plan of group {group.id}: {str(e)}")
 
-class ScheduleViewSet(viewsets.ModelViewSet):
+class ScheduleViewSet(IdempotencyMixin, TenantScopedMixin, ConditionalGetMixin, CachedRetrieveMixin, FastListMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Schedule.objects.select_related('teacher__user', 'observation_group__created_by').all()
     serializer_class = ScheduleSerializer
+    permission_classes = [IsStaffOrReadOnly]
+    tenant_lookups = ('teacher__tenant', 'observation_group__tenant')
+    validator_fields = (
+        'updated_at',
+        'teacher__updated_at',
+        'teacher__user__updated_at',
+        'observation_group__updated_at',
+        'observation_group__created_by__updated_at',
+        'observation_group__teachers__updated_at',
+        'observation_group__teachers__user__updated_at',
+    )
+    cache_dependencies = (Schedule, Teacher, Users, ObservationGroup)
+    fast_list = staticmethod(schedule_list)
+    export_fields = SCHEDULE_EXPORT_FIELDS
+    export_filename = 'schedules'
+
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """Move many schedules to one status with a single UPDATE; returns the ids that moved"""
+        params = BulkScheduleStatusSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        result = bulk_set_status(params.validated_data['ids'], params.validated_data['status'], queryset=self.get_queryset())
+        return Response({'status': params.validated_data['status'], **result})
     
     def perform_create(self, serializer):
         """Override create to send notification emails when schedules are created"""
         schedule = serializer.save()
+
+        try:
+            notify_schedules_created([schedule])
+        except Exception as e:
+            logger.error(f"Failed to create inbox notifications for schedule {schedule.id}: {str(e)}")
         
         # Send notification to teacher(s)
         try:
@@ -224,26 +390,11 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         if schedule.observation_group and schedule.observation_group.created_by:
             observer_name = schedule.observation_group.created_by.name
         
-        # Prepare observation data
-        observation_data = {
-            'date': schedule.date.strftime('%B %d, %Y'),
-            'time': schedule.time.strftime('%I:%M %p'),
-            'observation_type': schedule.observation_type,
-            'subject': teacher.subject or 'Not specified',
-            'grade': teacher.grade or 'Not specified',
-            'notes': schedule.notes or '',
-        }
-        
-        # Send notification
-        notification_sent = NotificationService.send_observation_scheduled_notification(
-            teacher_email=teacher.user.email,
-            teacher_name=teacher.user.name,
-            observation_data=observation_data,
-            observer_name=observer_name
-        )
+        # Send notification, or queue it for teachers on daily digests
+        counts = deliver_observation_scheduled([(teacher.user, scheduled_email_data(schedule, teacher), observer_name)], schedule.id)
         
-        # Update notification tracking
-        if notification_sent:
+        # Update notification tracking; queued notifications are marked when the digest goes out
+        if counts['sent']:
             schedule.notification_sent = True
             schedule.notification_sent_at = timezone.now()
             schedule.save(update_fields=['notification_sent', 'notification_sent_at'])
@@ -257,30 +408,19 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         observer_name = group.created_by.name if group.created_by else "Administrator"
         
         # Get all teachers in the group
-        teachers = group.teachers.all()
+        teachers = group.teachers.select_related('user')
         
+        recipients = []
         for teacher in teachers:
             if not teacher.user or not teacher.user.email:
                 continue
                 
-            # Prepare observation data for this teacher
-            observation_data = {
-                'date': schedule.date.strftime('%B %d, %Y'),
-                'time': schedule.time.strftime('%I:%M %p'),
-                'observation_type': schedule.observation_type,
-                'subject': teacher.subject or 'Not specified',
-                'grade': teacher.grade or 'Not specified',
-                'notes': schedule.notes or '',
-                'group_name': group.name,
-            }
-            
-            # Send notification
-            NotificationService.send_observation_scheduled_notification(
-                teacher_email=teacher.user.email,
-                teacher_name=teacher.user.name,
-                observation_data=observation_data,
-                observer_name=observer_name
-            )
+            recipients.append((teacher.user, scheduled_email_data(schedule, teacher, group.name), observer_name))
+        
+        # Digest users are queued in one insert; the digest marks the schedule once it goes out
+        counts = deliver_observation_scheduled(recipients, schedule.id)
+        if counts['queued']:
+            return
         
         # Update notification tracking for the schedule
         schedule.notification_sent = True
@@ -335,7 +475,198 @@ class ScheduleViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class AdministratorViewSet(viewsets.ModelViewSet):
+class AdministratorViewSet(TenantScopedMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Administrator.objects.all()
     serializer_class = AdministratorSerializer
+    permission_classes = [IsStaff]
+    tenant_lookups = ('user__tenant',)
+    validator_fields = ('updated_at', 'user__updated_at')
+
 
+class LessonPlanViewSet(TenantScopedMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = LessonPlan.objects.select_related('teacher__user', 'file').all()
+    serializer_class = LessonPlanSerializer
+    permission_classes = [IsActiveRole]
+    tenant_lookups = ('teacher__tenant',)
+    validator_fields = ('updated_at', 'teacher__updated_at', 'teacher__user__updated_at')
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the attached file; supports single byte-range requests"""
+        lesson_plan = self.get_object()
+        if not lesson_plan.file:
+            return Response({'error': 'No file uploaded for this lesson plan'}, status=status.HTTP_404_NOT_FOUND)
+        return ranged_file_response(request, lesson_plan.file, lesson_plan.filename or lesson_plan.file.sha256)
+
+class LessonPlanUploadViewSet(TenantScopedMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable uploads: create a session with the total size, then PUT raw
+    chunks to chunk/ with an Upload-Offset header. Retrieve the session to
+    find the offset to resume from after an interruption.
+    """
+    queryset = LessonPlanUpload.objects.select_related('lesson_plan').all()
+    serializer_class = LessonPlanUploadSerializer
+    permission_classes = [IsActiveRole]
+    tenant_lookups = ('lesson_plan__teacher__tenant',)
+
+    def perform_create(self, serializer):
+        lesson_plan = serializer.validated_data['lesson_plan']
+        if self.tenant_id and lesson_plan.teacher.tenant_id != self.tenant_id:
+            raise ValidationError({'lesson_plan': 'Lesson plan not found.'})
+        serializer.save()
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response({'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # Read the raw body stream directly so the chunk is never buffered whole
+            append_chunk(upload, request.stream or io.BytesIO(), offset)
+        except UploadError as e:
+            return Response(
+                {'error': str(e), 'received_bytes': upload.received_bytes},
+                status=e.status_code
+            )
+
+        response = Response(self.get_serializer(upload).data)
+        response['Upload-Offset'] = str(upload.received_bytes)
+        return response
+
+class NotificationPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class NotificationViewSet(ConditionalGetMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    The signed-in user's notification inbox
+
+    Staff may act on another user's inbox by passing ?user=<Users id> (or
+    "user" in the mark_read body), as may requests without credentials
+    while API_ENFORCE_ROLES is off.
+    """
+    queryset = Notification.objects.all()
+    serializer_class = NotificationSerializer
+    permission_classes = [IsActiveRole]
+    pagination_class = NotificationPagination
+
+    def _user_id(self, requested=None):
+        requested = requested or self.request.query_params.get('user')
+        if requested and (is_staff(self.request.user) or is_anonymous_allowed(self.request.user)):
+            return requested
+        linked = app_user(self.request.user) if self.request.user.is_authenticated else None
+        if linked is None:
+            raise ValidationError({'user': 'This query parameter is required.'})
+        if requested and str(requested) != str(linked.pk):
+            raise PermissionDenied('You can only use your own notification inbox.')
+        return linked.pk
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Staff may open any notification by id; everyone else only their own
+        if self.action == 'list' or not (is_staff(self.request.user) or is_anonymous_allowed(self.request.user)):
+            queryset = queryset.filter(user_id=self._user_id())
+        if self.action == 'list' and 'is_read' in self.request.query_params:
+            queryset = queryset.filter(is_read=self.request.query_params['is_read'].lower() == 'true')
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({'unread': unread_count(self._user_id())})
+
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        """Mark the given notification ids, or all of the user's notifications, as read"""
+        serializer = MarkNotificationsReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_id = self._user_id(serializer.validated_data.get('user'))
+        updated = mark_read(user_id, serializer.validated_data.get('ids'))
+        return Response({'updated': updated, 'unread': unread_count(user_id)})
+
+def _stream_subscriber(request):
+    """
+    The Users row and tenant an event stream belongs to, from a bearer token
+    or the session; None when the caller has no active role
+    """
+    try:
+        authenticated = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    user = authenticated[0] if authenticated else request.user
+    linked = app_user(user) if user_role(user) else None
+    if linked is None:
+        return None
+    request.user = user
+    return linked, resolve_tenant(request)
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events stream of schedule, group and notification changes
+
+    Delivers the events addressed to the signed-in user, within their tenant.
+    Needs an ASGI server (backend.asgi) so the connection does not hold a
+    worker thread.
+    """
+    subscriber = await sync_to_async(_stream_subscriber)(request)
+    if subscriber is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided or have no role.'}, status=401)
+    linked, tenant_id = subscriber
+    response = StreamingHttpResponse(
+        stream_events(linked.pk, tenant_id=tenant_id),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+class ArchivePagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+class ArchivedScheduleViewSet(TenantScopedMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """Read-only access to archived schedules; ?teacher=, ?start=, ?end= and ?status= filter lists"""
+    queryset = ArchivedSchedule.objects.select_related('teacher__user', 'observation_group')
+    tenant_lookups = ('teacher__tenant', 'observation_group__tenant')
+    serializer_class = ArchivedScheduleSerializer
+    permission_classes = [IsStaffOrReadOnly]
+    pagination_class = ArchivePagination
+    validator_fields = ('archived_at',)
+
+    def _filters(self):
+        params = ScheduleHistoryQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return params.validated_data
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            filters = self._filters()
+            if 'teacher' in filters:
+                queryset = queryset.filter(teacher_id=filters['teacher'])
+            if 'start' in filters:
+                queryset = queryset.filter(date__gte=filters['start'])
+            if 'end' in filters:
+                queryset = queryset.filter(date__lte=filters['end'])
+            if filters.get('status'):
+                queryset = queryset.filter(status__in=filters['status'])
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """Live and archived schedules together, newest first, for historical reports"""
+        filters = self._filters()
+        rows = schedule_history(
+            teacher=filters.get('teacher'),
+            start=filters.get('start'),
+            end=filters.get('end'),
+            statuses=filters.get('status'),
+            tenant=self.tenant_id,
+        )
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(page)
@@ -0,0 +1,111 @@
+"""
+JWT authentication that resolves users from a per-process cache
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFAULT_USER_CACHE_TTL = 60
+DEFAULT_USER_CACHE_SIZE = 1024
+
+
+class UserCache:
+    """
+    Thread-safe LRU of authenticated users with a per-entry TTL
+
+    Entries are dropped by signal handlers when the user or its linked Users
+    row is saved or deleted; the TTL bounds staleness for writes that bypass
+    signals, such as queryset.update().
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Requests get their own copy so per-request attributes never leak
+        return copy.copy(user)
+
+    def set(self, key, user):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_email(self, email: str):
+        with self._lock:
+            stale = [key for key, (_, user) in self._entries.items() if user.email == email]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache(
+    getattr(settings, 'JWT_USER_CACHE_SIZE', DEFAULT_USER_CACHE_SIZE),
+    getattr(settings, 'JWT_USER_CACHE_TTL', DEFAULT_USER_CACHE_TTL),
+)
+
+
+def get_app_user(user):
+    """The api Users row (name, role, status) linked to an auth user by email"""
+    from api.models.user import Users
+    if not user.email:
+        return None
+    return Users.all_tenants.filter(email=user.email).first()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Validates the token signature locally and serves the user, with its
+    linked Users row on ``user.app_user``, from user_cache. Only a cache miss
+    touches the database.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken('Token contained no recognizable user identification') from e
+
+        key = str(user_id)
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user.app_user = get_app_user(user)
+            user_cache.set(key, user)
+            return copy.copy(user)
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+        return user
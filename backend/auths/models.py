@@ -6,7 +6,9 @@ from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 from .usermanager import UserManager
 from django.utils import timezone
-from rest_framework_simplejwt.tokens import RefreshToken
+from backend.lazy import lazy_import
+
+RefreshToken = lazy_import('auths.tokens', 'RefreshToken')
 
 # Create your models here.
 
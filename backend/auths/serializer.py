@@ -5,6 +5,8 @@ from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.password_validation import validate_password
 from .models import ResetPassword
 from .utils import user_email
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from .tokens import RefreshToken
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
@@ -79,4 +81,9 @@ class RequestPasswordSerializer(serializers.Serializer):
 class PasswordResetSerializer(serializers.Serializer):
     email = serializers.EmailField(min_length=10)
     code = serializers.CharField(max_length=6)
-    new_password = serializers.CharField(write_only=True, validators=[validate_password], required=True)
\ No newline at end of file
+    new_password = serializers.CharField(write_only=True, validators=[validate_password], required=True)
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh serializer that checks the cache-backed blacklist"""
+    token_class = RefreshToken
@@ -0,0 +1,20 @@
+"""
+Keep the JWT user cache in step with user and role changes
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import user_cache
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def auth_user_changed(sender, instance, **kwargs):
+    # Saves cover deactivation (is_active=False) and password changes
+    user_cache.discard(str(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+@receiver([post_save, post_delete], sender='api.Users')
+def app_user_changed(sender, instance, **kwargs):
+    user_cache.discard_email(instance.email)
@@ -1,3 +1,92 @@
+import io
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models.user import Users
+from .authentication import CachedJWTAuthentication, user_cache
+from .serializer import TokenRefreshSerializer
+from .tokens import RefreshToken
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='ada', email='ada@example.org', password='secret')
+        self.profile = Users.objects.create(name='Ada', email='ada@example.org', role='Teacher')
+        self.header = f'Bearer {AccessToken.for_user(self.user)}'
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/api/users/', HTTP_AUTHORIZATION=self.header)
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_second_request_skips_queries(self):
+        with self.assertNumQueries(2):
+            user = self.authenticate()
+        self.assertEqual(user.app_user.role, 'Teacher')
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.app_user, self.profile)
+
+    def test_role_change_invalidates_entry(self):
+        self.authenticate()
+        self.profile.role = 'Administrator'
+        self.profile.save()
+        self.assertEqual(self.authenticate().app_user.role, 'Administrator')
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ada', email='ada@example.org', password='secret')
+
+    def test_issuing_tokens_writes_no_rows(self):
+        RefreshToken.for_user(self.user)
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_blacklisted_token_is_rejected_from_cache(self):
+        token = str(RefreshToken.for_user(self.user))
+        RefreshToken(token).blacklist()
+        with self.assertNumQueries(0):
+            with self.assertRaises(TokenError):
+                RefreshToken(token)
+
+    def test_database_fallback_after_cache_loss(self):
+        token = str(RefreshToken.for_user(self.user))
+        RefreshToken(token).blacklist()
+        cache.clear()
+        serializer = TokenRefreshSerializer(data={'refresh': token})
+        with self.assertRaises(TokenError):
+            serializer.is_valid()
+
+    def test_valid_token_check_is_cached(self):
+        token = str(RefreshToken.for_user(self.user))
+        with self.assertNumQueries(1):
+            RefreshToken(token)
+            RefreshToken(token)
+
+    def test_purge_removes_only_expired_rows(self):
+        for index, expires_at in enumerate([timezone.now() - timedelta(days=1), timezone.now() + timedelta(days=1)]):
+            outstanding = OutstandingToken.objects.create(jti=f'jti-{index}', token='t', expires_at=expires_at)
+            BlacklistedToken.objects.create(token=outstanding)
+
+        call_command('purge_expired_tokens', batch_size=1, stdout=io.StringIO())
 
-# Create your tests here.
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['jti-1'])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
@@ -0,0 +1,87 @@
+"""
+Refresh tokens whose blacklist lives in the cache, with the token_blacklist tables as fallback
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken, Token
+
+logger = logging.getLogger(__name__)
+
+# Longest a "not revoked" answer is trusted before the database is asked again;
+# bounds staleness when each process has its own cache
+DEFAULT_BLACKLIST_NEGATIVE_TTL = 60
+
+REVOKED = 1
+NOT_REVOKED = 0
+
+
+def _key(jti: str) -> str:
+    return f'jwt:blacklist:{jti}'
+
+
+def _remaining_lifetime(exp) -> int:
+    return max(int(exp - time.time()), 1)
+
+
+def remember_revoked(jti: str, exp):
+    """Record a revoked JTI until the token would have expired anyway"""
+    try:
+        cache.set(_key(jti), REVOKED, _remaining_lifetime(exp))
+    except Exception:
+        logger.exception('Could not cache blacklisted token %s', jti)
+
+
+def is_revoked(jti: str, exp) -> bool:
+    """
+    Whether a token has been blacklisted
+
+    Answers from the cache when it can; a miss or a cache outage falls back to
+    the BlacklistedToken table and the answer is cached for next time.
+    """
+    try:
+        state = cache.get(_key(jti))
+    except Exception:
+        logger.exception('Token blacklist cache unavailable, checking the database')
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    if state is not None:
+        return state == REVOKED
+
+    revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    ttl = _remaining_lifetime(exp)
+    if not revoked:
+        ttl = min(ttl, getattr(settings, 'JWT_BLACKLIST_NEGATIVE_TTL', DEFAULT_BLACKLIST_NEGATIVE_TTL))
+    try:
+        cache.set(_key(jti), REVOKED if revoked else NOT_REVOKED, ttl)
+    except Exception:
+        pass
+    return revoked
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    simplejwt's RefreshToken with a cache-first blacklist
+
+    Issuing a token no longer writes an OutstandingToken row; one is created
+    only when the token is blacklisted, so the tables hold revoked tokens
+    alone and purge_expired_tokens can empty them as they expire.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Token.for_user directly, skipping BlacklistMixin's OutstandingToken insert
+        return Token.for_user.__func__(cls, user)
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        remember_revoked(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return super().blacklist()
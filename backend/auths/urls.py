@@ -1,6 +1,7 @@
 from django.urls import path, include
 from .views import *
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 urlpatterns = [
@@ -12,6 +13,7 @@ urlpatterns = [
     #google auth
     path('google-auth/', GoogleAuthView.as_view(), name='google-auth'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
 ]
 
 urlpatterns += router.urls
\ No newline at end of file
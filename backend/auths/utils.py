@@ -1,4 +1,3 @@
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.urls import reverse
 import random
 from django.conf import settings
@@ -6,7 +5,9 @@ from datetime import datetime, timedelta
 from django.core.mail import EmailMessage, send_mail
 from django.contrib.sites.shortcuts import get_current_site
 from django.contrib.auth import get_user_model
-import jwt
+from backend.lazy import lazy_import
+
+jwt = lazy_import('jwt')
 
 
 # user=get_user_model()
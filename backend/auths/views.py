@@ -6,8 +6,6 @@ from django.contrib.auth import get_user_model
 from django.utils.decorators import method_decorator
 from django.contrib.sites.shortcuts import get_current_site
 from django.conf import settings
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
 from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status, views, generics
 from rest_framework.response import Response
@@ -17,23 +15,44 @@ from rest_framework.validators import ValidationError
 from rest_framework.decorators import action
 from django.utils.translation import gettext_lazy as _
 from .serializer import *
-from rest_framework_simplejwt.tokens import RefreshToken
 from .utils import Util, user_email, generate_six_digit_code, send_reset_code
 from .models import ResetPassword
 from datetime import datetime, timedelta
-import jwt
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-import requests
-from google.oauth2 import id_token  
 from rest_framework import permissions
-from google.auth.transport import requests as google_requests
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import HttpResponse
+from django.apps import apps
+from backend.lazy import lazy_import
+
+# Heavy or optional dependencies are imported on first use, not at startup
+jwt = lazy_import('jwt')
+RefreshToken = lazy_import('auths.tokens', 'RefreshToken')
+id_token = lazy_import('google.oauth2.id_token')
+google_requests = lazy_import('google.auth.transport.requests')
 
 User = get_user_model()
 
+
+def email_verification_schema(view_method):
+    """Document the verify token parameter when drf_yasg is serving API docs"""
+    if not apps.is_installed('drf_yasg'):
+        return view_method
+    from drf_yasg import openapi
+    from drf_yasg.utils import swagger_auto_schema
+    return swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'token',
+                openapi.IN_QUERY,
+                description="JWT token for email verification",
+                type=openapi.TYPE_STRING
+            )
+        ]
+    )(view_method)
+
 @method_decorator(csrf_exempt, name="dispatch")
 class GoogleAuthView(APIView):
     def post(self, request):
@@ -129,14 +148,19 @@ class RegisterAPIView(APIView):
             if password != confirm_password:
                 return Response({"error": "Passwords do not match"}, status=status.HTTP_400_BAD_REQUEST)
 
-            user = User.objects.create_user(
-                email=email,
-                password=password,
-                first_name=first_name,
-                last_name=last_name,
-                is_active=False,
-                is_verified=False,
-            )
+            # AUTH_USER_MODEL may be django.contrib.auth's User, which signs in
+            # by username and has no is_verified flag; is_active gates it instead
+            fields = {
+                "email": email,
+                User.USERNAME_FIELD: email,
+                "password": password,
+                "first_name": first_name,
+                "last_name": last_name,
+                "is_active": False,
+            }
+            if hasattr(User, "is_verified"):
+                fields["is_verified"] = False
+            user = User.objects.create_user(**fields)
 
             user_email(request, user)
 
@@ -146,7 +170,7 @@ class RegisterAPIView(APIView):
                     "email": user.email,
                     "first_name": user.first_name,
                     "last_name": user.last_name,
-                    "is_verified": user.is_verified,
+                    "is_verified": getattr(user, "is_verified", False),
                 }
             }, status=status.HTTP_201_CREATED)
 
@@ -180,9 +204,11 @@ class LoginAPIView(APIView):
                 print(f"Authentication failed for email/username: {email}")
                 return Response({"error": "Invalid credentials"}, status=401)
 
-            print(f"User found: {user.email}, Verified: {user.is_verified}, Active: {user.is_active}")
+            # Without an is_verified flag, verify-email activating the account is the verification
+            verified = getattr(user, "is_verified", user.is_active)
+            print(f"User found: {user.email}, Verified: {verified}, Active: {user.is_active}")
 
-            if not user.is_verified:
+            if not verified:
                 print("User email not verified")
                 return Response({"error": "Email not verified"}, status=401)
 
@@ -202,7 +228,7 @@ class LoginAPIView(APIView):
                     "email": user.email,
                     "first_name": user.first_name,
                     "last_name": user.last_name,
-                    "is_verified": user.is_verified,
+                    "is_verified": verified,
                 }
             }, status=200)
 
@@ -219,16 +245,7 @@ class VerifyEmailViewSet(viewsets.GenericViewSet):
     serializer_class = VerifyEmailSerializer
     permission_classes = [AllowAny]
 
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'token',
-                openapi.IN_QUERY,
-                description="JWT token for email verification",
-                type=openapi.TYPE_STRING
-            )
-        ]
-    )
+    @email_verification_schema
     @action(methods=['get'], detail=False)
     def verify(self, request):
         token = request.GET.get('token')
@@ -3,6 +3,10 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve through this module (e.g. ``uvicorn backend.asgi:application``) so the
+long-lived /api/events/ Server-Sent Events stream runs on the event loop
+instead of tying up a WSGI worker per connected browser.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
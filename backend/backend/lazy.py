@@ -0,0 +1,40 @@
+import importlib
+import threading
+
+
+class LazyImport:
+    """
+    Stand-in for a module or module attribute that is imported on first use
+
+    Attribute access and calls are forwarded to the real object, so
+    ``jwt = lazy_import('jwt')`` can be used exactly like ``import jwt``.
+    """
+
+    def __init__(self, module_name, attribute=None):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    module = importlib.import_module(self._module_name)
+                    self._target = getattr(module, self._attribute) if self._attribute else module
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f'{self._module_name}.{self._attribute}' if self._attribute else self._module_name
+        state = 'loaded' if self._target is not None else 'not loaded'
+        return f'<lazy {name} ({state})>'
+
+
+def lazy_import(module_name, attribute=None):
+    return LazyImport(module_name, attribute)
@@ -0,0 +1,246 @@
+"""
+Read-replica routing
+
+Reads go to a replica only while a request that is allowed to use one is
+being handled: ReplicaRoutingMiddleware opens that window for safe-method
+requests from clients that have not written recently. Everything else,
+including management commands, signals and reads inside a transaction, uses
+the primary.
+
+After an unsafe request the client is pinned to the primary for
+REPLICA_PIN_SECONDS, so it reads its own writes even when replicas lag. The
+pin lives in the default cache; with the per-process local memory cache it
+only holds within one worker, so set REDIS_URL when running several.
+
+Each request reads from one replica, chosen on its first read, so every
+query in it sees the same point in the replication stream.
+
+A replica that fails to connect is skipped for REPLICA_RETRY_SECONDS before
+it is tried again; with no healthy replica, reads go to the primary. A
+replica that fails mid-request with an OperationalError is skipped the same
+way, and the request is run again against the primary.
+"""
+import contextvars
+import hashlib
+import random
+import threading
+import time
+from typing import List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import ConnectionDoesNotExist, DatabaseError, OperationalError
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+DEFAULT_PIN_SECONDS = 5
+DEFAULT_RETRY_SECONDS = 30
+
+
+class ReadState:
+    """Replica a request reads from; None until its first read picks one"""
+
+    __slots__ = ('alias', 'retried')
+
+    def __init__(self):
+        self.alias = None
+        self.retried = False
+
+
+# Shared by reference with the threads sync_to_async runs the ORM in, so the
+# replica picked by one query is the one every later query of the request uses
+_read_state = contextvars.ContextVar('read_state', default=None)
+_down_until = {}
+_down_lock = threading.Lock()
+
+
+def replica_aliases() -> List[str]:
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def mark_unavailable(alias: str, seconds: Optional[float] = None):
+    seconds = seconds if seconds is not None else getattr(settings, 'REPLICA_RETRY_SECONDS', DEFAULT_RETRY_SECONDS)
+    with _down_lock:
+        _down_until[alias] = time.monotonic() + seconds
+
+
+def reset_availability():
+    with _down_lock:
+        _down_until.clear()
+
+
+def is_available(alias: str) -> bool:
+    """Whether a replica can be used, connecting to it if needed"""
+    with _down_lock:
+        if _down_until.get(alias, 0) > time.monotonic():
+            return False
+        _down_until.pop(alias, None)
+    try:
+        connections[alias].ensure_connection()
+    except (ConnectionDoesNotExist, DatabaseError):
+        mark_unavailable(alias)
+        return False
+    return True
+
+
+def choose_replica() -> Optional[str]:
+    """A random healthy replica, or None when reads should stay on the primary"""
+    candidates = replica_aliases()
+    random.shuffle(candidates)
+    for alias in candidates:
+        if is_available(alias):
+            return alias
+    return None
+
+
+class ReplicaRouter:
+    """Sends reads to a replica inside a replica-enabled request, everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        state = _read_state.get()
+        if state is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            state.alias = choose_replica() or DEFAULT_DB_ALIAS
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        return db not in replica_aliases()
+
+
+def client_key(request) -> str:
+    """Cache key identifying the client a primary pin belongs to"""
+    identity = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return 'db-pin:' + hashlib.sha1(identity.encode()).hexdigest()
+
+
+def is_pinned(request) -> bool:
+    return bool(cache.get(client_key(request)))
+
+
+async def ais_pinned(request) -> bool:
+    return bool(await cache.aget(client_key(request)))
+
+
+def _pin_seconds(seconds: Optional[float]) -> float:
+    return seconds if seconds is not None else getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+def pin_to_primary(request, seconds: Optional[float] = None):
+    cache.set(client_key(request), True, _pin_seconds(seconds))
+
+
+async def apin_to_primary(request, seconds: Optional[float] = None):
+    await cache.aset(client_key(request), True, _pin_seconds(seconds))
+
+
+class ReplicaRoutingMiddleware:
+    """Opens the replica window for safe requests and pins clients to the primary after writes"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        safe = request.method in SAFE_METHODS
+        state = ReadState() if safe and not is_pinned(request) else None
+        token = _read_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_state.reset(token)
+        if not safe:
+            pin_to_primary(request)
+        return self._wrap_streaming(response, state)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        safe = request.method in SAFE_METHODS
+        state = ReadState() if safe and not await ais_pinned(request) else None
+        token = _read_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_state.reset(token)
+        if not safe:
+            await apin_to_primary(request)
+        return self._wrap_streaming(response, state)
+
+    def process_exception(self, request, exception):
+        """Run a safe request again on the primary when its replica fails mid-request"""
+        state = _read_state.get()
+        if (
+            not isinstance(exception, OperationalError)
+            or state is None
+            or state.alias in (None, DEFAULT_DB_ALIAS)
+            or state.retried
+        ):
+            return None
+        match = request.resolver_match
+        if match is None or iscoroutinefunction(match.func):
+            return None
+        mark_unavailable(state.alias)
+        state.alias = DEFAULT_DB_ALIAS
+        state.retried = True
+        return match.func(request, *match.args, **match.kwargs)
+
+    def _wrap_streaming(self, response, state):
+        # Exports run their queries while the body is read, after the view returns
+        if state is not None and response.streaming:
+            if response.is_async:
+                response.streaming_content = _aon_replicas(response.streaming_content, state)
+            else:
+                response.streaming_content = _on_replicas(response.streaming_content, state)
+        return response
+
+
+def _on_replicas(chunks, state):
+    # Set around each step, since ASGI servers may advance the iterator from another context
+    iterator = iter(chunks)
+    while True:
+        token = _read_state.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _read_state.reset(token)
+        yield chunk
+
+
+async def _aon_replicas(chunks, state):
+    iterator = aiter(chunks)
+    while True:
+        token = _read_state.set(state)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _read_state.reset(token)
+        yield chunk
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 
     #third party apps
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
 
     #local apps
@@ -68,10 +69,30 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'backend.routers.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
 
+REST_FRAMEWORK = {
+    # Bearer JWTs resolve users from an in-process cache; sessions keep working for the admin
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'auths.authentication.CachedJWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    # orjson-backed when installed, otherwise identical to DRF's JSON classes
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -107,6 +128,75 @@ DATABASES = {
     )
 }
 
+# Read replicas: comma-separated URLs in DATABASE_REPLICA_URLS become the
+# aliases replica1, replica2, ... Safe-method requests read from them (see
+# backend/routers.py); tests mirror them onto default.
+DATABASE_REPLICAS = []
+for index, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = dj_database_url.parse(url.strip())
+    DATABASES[f'replica{index}']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(f'replica{index}')
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+# Seconds a client reads from the primary after writing, and seconds a failed replica is skipped
+REPLICA_PIN_SECONDS = 5
+REPLICA_RETRY_SECONDS = 30
+
+# Cache
+# Detail payloads, version counters and unread counts live here. The local
+# memory cache is per process, so set REDIS_URL wherever more than one worker
+# serves traffic or invalidations will not reach the other workers.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a serialized detail response stays in the read-through cache
+DETAIL_CACHE_TTL = 300
+
+# Completed and cancelled schedules older than this many days move to the archive table
+SCHEDULE_ARCHIVE_AFTER_DAYS = 180
+
+# Range-partition api_schedule by school year on PostgreSQL (migration 0007 and
+# the partition_schedules command). School years start on the 1st of this month,
+# and partitions are kept this many years ahead of the current one.
+SCHEDULE_PARTITIONING = os.environ.get('SCHEDULE_PARTITIONING', '').lower() in ('1', 'true', 'yes')
+SCHOOL_YEAR_START_MONTH = 7
+SCHEDULE_PARTITIONS_AHEAD = 2
+
+# Tenant that migration 0010 assigns rows created before tenancy to
+DEFAULT_TENANT_SLUG = os.environ.get('DEFAULT_TENANT_SLUG', 'default')
+DEFAULT_TENANT_NAME = os.environ.get('DEFAULT_TENANT_NAME', 'T-TESS Bloom')
+
+# Per-process cache of JWT-authenticated users: seconds an entry lives, and entries kept
+JWT_USER_CACHE_TTL = 60
+JWT_USER_CACHE_SIZE = 1024
+
+# Seconds a "not blacklisted" answer for a refresh token is cached before the database is asked again
+JWT_BLACKLIST_NEGATIVE_TTL = 60
+
+# Bulk account creation hashes passwords in a process pool once a batch reaches this size
+PASSWORD_HASH_PARALLEL_THRESHOLD = 16
+# Worker processes in the per-process hashing pool that requests share
+PASSWORD_HASH_MAX_WORKERS = 4
+
+# Reject api requests that carry no credentials; until set, only authenticated
+# requests are held to their role (see api/permissions.py)
+API_ENFORCE_ROLES = os.environ.get('API_ENFORCE_ROLES', '').lower() in ('1', 'true', 'yes')
+
+SIMPLE_JWT = {
+    'TOKEN_REFRESH_SERIALIZER': 'auths.serializer.TokenRefreshSerializer',
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -143,13 +233,21 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (lesson plan documents)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
+# Largest lesson plan upload accepted, in bytes
+LESSON_PLAN_MAX_UPLOAD_SIZE = int(os.environ.get('LESSON_PLAN_MAX_UPLOAD_SIZE', 2 * 1024 * 1024 * 1024))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Supabase Configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL', '')
+# The project URL is shared with the frontend, whose .env only names it NEXT_PUBLIC_SUPABASE_URL
+SUPABASE_URL = os.getenv('SUPABASE_URL') or os.getenv('NEXT_PUBLIC_SUPABASE_URL', '')
 SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
 
 # CORS settings
@@ -178,13 +276,17 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'idempotency-key',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-tenant',
 ]
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+CORS_EXPOSE_HEADERS = ['idempotent-replayed']
+
+EMAIL_BACKEND = "api.email_backends.ThrottledSMTPBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -192,6 +294,26 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
+# Sender accounts the throttled backend rotates through, as comma-separated
+# user:password pairs in EMAIL_SENDER_ACCOUNTS; defaults to EMAIL_HOST_USER alone.
+# Mail from DEFAULT_FROM_EMAIL is sent as whichever account carries it.
+EMAIL_SENDER_ACCOUNTS = [
+    {'username': user, 'password': password, 'from_email': user}
+    for user, _, password in (
+        pair.strip().partition(':') for pair in os.environ.get('EMAIL_SENDER_ACCOUNTS', '').split(',') if pair.strip()
+    )
+]
+# Messages per second each account may send, and how many may go out back to back
+EMAIL_SEND_RATE = float(os.environ.get('EMAIL_SEND_RATE', 1.0))
+EMAIL_SEND_BURST = 10
+# Throttled (4xx) accounts rest EMAIL_BACKOFF_BASE * 2**n seconds, up to EMAIL_BACKOFF_MAX,
+# and a message is tried this many times before the error is raised
+EMAIL_BACKOFF_BASE = 2.0
+EMAIL_BACKOFF_MAX = 300.0
+EMAIL_SEND_MAX_ATTEMPTS = 5
+# Seconds a send may wait for the quota before SendThrottled is raised; commands pass max_wait=None
+EMAIL_SEND_MAX_WAIT = 2.0
+
 # Site URL for links in emails
 SITE_URL = os.environ.get('SITE_URL', 'https://tet-bloom-git-main-nanikworkforces-projects.vercel.app')
 
@@ -206,5 +328,24 @@ NOTIFICATION_SETTINGS = {
         'enabled': True,
         'subject': 'Observation Reminder - T-TESS Bloom',
         'template': 'observation_reminder.html'
+    },
+    # Sent once a day by send_notification_digests to users on digest delivery
+    'OBSERVATION_DIGEST': {
+        'enabled': True,
+        'subject': 'Your Daily Observation Digest - T-TESS Bloom',
+        # Seconds before rows claimed by a run that never finished are sent again
+        'claim_timeout': 60 * 60,
     }
-}
\ No newline at end of file
+}
+# Seconds a user's cached unread notification count is kept before recounting
+NOTIFICATION_UNREAD_CACHE_TTL = 60 * 60 * 24
+
+# Live change events (/api/events/). The in-memory backend only reaches clients
+# connected to the same process.
+EVENTS_BACKEND = 'api.events.InMemoryBackend'
+EVENTS_HEARTBEAT_SECONDS = 15
+
+# Idempotency-Key handling on user and schedule writes: seconds a first response
+# is replayed for retries, and seconds a duplicate waits on the in-flight request
+IDEMPOTENCY_TTL = 60 * 10
+IDEMPOTENCY_WAIT = 30